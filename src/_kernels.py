@@ -0,0 +1,74 @@
+"""
+Numeric reduction kernels for the statistics step.
+
+When Numba is installed the kernels are JIT-compiled (cached on disk); otherwise
+equivalent NumPy implementations are used. Numba is imported on the first kernel call,
+not with this module, to keep it off the app's startup path.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def _numba_kernels():
+    """
+    The Numba-compiled kernels module, imported on first use (compiled, or loaded from the
+    on-disk cache, on the first call); None when Numba isn't installed.
+    """
+    try:
+        from src import _numba_kernels
+    except Exception:
+        return None
+    return _numba_kernels
+
+
+def _col_moments_numpy(X, shift):
+    mask = ~np.isnan(X)
+    d = np.where(mask, X - shift, 0.0)
+    d2 = d * d
+    out = np.empty((X.shape[1], 5))
+    out[:, 0] = d.sum(axis=0)
+    out[:, 1] = d2.sum(axis=0)
+    out[:, 2] = (d2 * d).sum(axis=0)
+    out[:, 3] = (d2 * d2).sum(axis=0)
+    out[:, 4] = mask.sum(axis=0)
+    return out
+
+
+def _entropy_numpy(counts):
+    counts = counts[counts > 0]
+    if counts.size == 0:
+        return np.nan
+    probs = counts / counts.sum()
+    return -np.dot(probs, np.log2(probs))
+
+
+def col_moments(X, shift):
+    """
+    Per-column power sums of the shifted, non-missing values of a 2-D float block.
+
+    :param X: (rows, columns) float64 array, NaN for missing values
+    :param shift: (columns,) float64 values subtracted before taking powers
+    :return: (columns, 5) array of [sum d, sum d^2, sum d^3, sum d^4, count]
+    """
+    kernels = _numba_kernels()
+    if kernels is not None:
+        # Column-major layout keeps each column's inner loop on contiguous memory
+        return kernels.col_moments(np.asfortranarray(X, dtype=np.float64), shift.astype(np.float64))
+    return _col_moments_numpy(X, shift)
+
+
+def entropy(counts):
+    """
+    Shannon entropy (bits) of a category count vector; zero counts are ignored.
+
+    :param counts: 1-D array of non-negative counts
+    :return: float entropy, NaN if every count is zero
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    kernels = _numba_kernels()
+    if kernels is not None:
+        return kernels.entropy(counts)
+    return _entropy_numpy(counts)
+
@@ -0,0 +1,54 @@
+"""
+Numba-compiled versions of the `src._kernels` reductions.
+
+Imported by `src._kernels` on the first kernel call rather than at startup, so importing
+the report pipeline doesn't pay Numba's import and compile-or-load time.
+"""
+import numpy as np
+from numba import njit
+
+# No `nnan` fast-math flag: the kernels rely on `v == v` to skip missing values
+_FASTMATH = {'reassoc', 'contract', 'arcp'}
+
+
+# Serial on purpose: the per-column scan is memory-bound, and a parallel kernel aborts the
+# process when Numba falls back to its non-threadsafe `workqueue` layer and two threads
+# (e.g. Streamlit sessions) compute statistics at once
+@njit(fastmath=_FASTMATH, cache=True)
+def col_moments(X, shift):
+    k = X.shape[1]
+    out = np.empty((k, 5))
+    for j in range(k):
+        s1 = s2 = s3 = s4 = 0.0
+        c = 0
+        for i in range(X.shape[0]):
+            v = X[i, j]
+            if v == v:
+                d = v - shift[j]
+                d2 = d * d
+                s1 += d
+                s2 += d2
+                s3 += d2 * d
+                s4 += d2 * d2
+                c += 1
+        out[j, 0] = s1
+        out[j, 1] = s2
+        out[j, 2] = s3
+        out[j, 3] = s4
+        out[j, 4] = c
+    return out
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def entropy(counts):
+    total = 0.0
+    for c in counts:
+        total += c
+    if total == 0:
+        return np.nan
+    h = 0.0
+    for c in counts:
+        if c > 0:
+            p = c / total
+            h -= p * np.log2(p)
+    return h
@@ -1,19 +1,80 @@
+import asyncio
+import threading
+from functools import lru_cache
+
+
+# Guards construction of the shared sync client so concurrent first calls build only one
+_CLIENT_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _build_shared_client(api_key):
+    import openai
+
+    # Retries are handled by `AiSummary._retry_policy`; don't stack the SDK's own retries on top
+    if api_key:
+        return openai.OpenAI(api_key=api_key, max_retries=0)
+    return openai.OpenAI(max_retries=0)
+
+
+def _shared_client(api_key=None):
+    """
+    Process-wide `openai.OpenAI` client per API key.
+
+    Reusing one client keeps its HTTP connection pool (and TLS sessions) alive across
+    report runs, e.g. for every request served by the Streamlit app.
+    """
+    with _CLIENT_LOCK:
+        return _build_shared_client(api_key)
+
+
+@lru_cache(maxsize=8)
+def _sync_model_callable(api_key, model_name, max_tokens, temperature):
+    """Chat-completion callable bound to the shared client and one set of model parameters."""
+    client = _shared_client(api_key)
+
+    def model_callable(prompt: str, stream: bool = False):
+        return client.chat.completions.create(
+            model=model_name,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=stream,
+        )
+
+    return model_callable
+
+
 class AiSummary:
-    def __init__(self, model):
+    def __init__(self, model, cache=None, model_params=None, amodel=None, async_client=None, client=None,
+                 supports_stream=False):
         self.model = model  # LLM instance
+        self.supports_stream = supports_stream  # model(prompt, stream=True) yields chunks
+        self.client = client  # underlying openai.OpenAI client, needed for the Batch API
+        self.amodel = amodel  # optional async callable: `await amodel(prompt)`
+        self._async_client = async_client  # closed by aclose()
+        self.cache = cache  # optional LLMCache
+        # {model_name, temperature, max_tokens}; needed to key the cache
+        self.model_params = model_params
+        # Set by each summary call: False when a section was dropped or a stream was cut off
+        self.last_report_complete = False
 
     @classmethod
-    def get_ai_model(cls, api_key: str = None, model_name: str = 'gpt-3.5-turbo', max_tokens: int = 1500, temperature: float = 0.0):
+    def get_ai_model(cls, api_key: str = None, model_name: str = 'gpt-3.5-turbo', max_tokens: int = 1500, temperature: float = 0.0, cache=None):
         """
         Create a callable wrapper around the installed OpenAI client (new-style or legacy).
 
-        The returned object's `model` attribute is a callable that accepts a single
-        `prompt: str` argument and returns whatever the underlying SDK returns.
+        The returned object's `model` attribute is a callable that accepts a
+        `prompt: str` argument and returns whatever the underlying SDK returns (a chunk
+        iterator when called with `stream=True`); `amodel` is the awaitable counterpart
+        backed by `openai.AsyncOpenAI`. The sync client and the model callable are memoized,
+        so repeated calls with the same parameters reuse one pooled HTTP connection.
 
         :param api_key: Optional OpenAI API key. If omitted, the SDK will use env vars.
         :param model_name: Model name to request (default: 'gpt-3.5-turbo').
         :param max_tokens: Max tokens for the completion call.
         :param temperature: Sampling temperature.
+        :param cache: Optional LLMCache; only consulted when temperature is 0.
         :return: AiSummary instance with .model callable.
         :raises ImportError: if the OpenAI SDK isn't installed.
         """
@@ -23,11 +84,18 @@ class AiSummary:
             raise ImportError('OpenAI SDK not installed. Install with `pip install openai` or provide a custom model callable.') from e
 
         # New-style OpenAI client present in recent SDKs
+        client = None
+        async_client = None
         if hasattr(openai, 'OpenAI'):
-            client = openai.OpenAI(api_key=api_key) if api_key else openai.OpenAI()
+            # The sync client (and its connection pool) is shared across calls. The async
+            # client's connections are bound to the running event loop, so each report run
+            # builds its own and closes it in `aclose()`.
+            client = _shared_client(api_key)
+            model_callable = _sync_model_callable(api_key, model_name, max_tokens, temperature)
+            async_client = cls._build_async_client(openai, api_key)
 
-            def model_callable(prompt: str):
-                return client.chat.completions.create(
+            async def acall(prompt: str):
+                return await async_client.chat.completions.create(
                     model=model_name,
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=max_tokens,
@@ -38,26 +106,106 @@ class AiSummary:
             if api_key:
                 openai.api_key = api_key
 
-            def model_callable(prompt: str):
+            def model_callable(prompt: str, stream: bool = False):
                 return openai.ChatCompletion.create(
                     model=model_name,
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=max_tokens,
                     temperature=temperature,
+                    stream=stream,
+                )
+
+            async def acall(prompt: str):
+                return await openai.ChatCompletion.acreate(
+                    model=model_name,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
                 )
 
-        return cls(model_callable)
+        model_params = {"model_name": model_name, "temperature": temperature, "max_tokens": max_tokens}
+        return cls(model_callable, cache=cache, model_params=model_params, amodel=acall,
+                   async_client=async_client, client=client, supports_stream=True)
 
-    def generate_ai_summary(self, csv_data, context=None):
+    @staticmethod
+    def _build_async_client(openai, api_key=None):
         """
-        Generate the ai summary report of any CSV dataset.
-        
-        :param csv_data: stringified summary of the csv data
-        :param context: optional dict, containing additional analysis parameters or requirements
-                       e.g., {'focus_columns': ['col1', 'col2'], 'target_variable': 'target'}
-        :return: str, ai summary report
+        Build an `AsyncOpenAI` client for concurrent prompts.
+
+        The SDK's default pool (1000 connections, 100 keep-alive) already exceeds
+        `max_concurrency`, so only HTTP/2 is switched on, when `h2` is installed, to multiplex
+        the section prompts over one connection. Timeouts and limits stay at the SDK defaults.
+        """
+        import importlib.util
+
+        http_client = openai.DefaultAsyncHttpxClient(http2=importlib.util.find_spec('h2') is not None)
+        if api_key:
+            return openai.AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+        return openai.AsyncOpenAI(http_client=http_client, max_retries=0)
+
+    @staticmethod
+    def _transient_errors():
+        """Exception types worth retrying: rate limits, connection errors and timeouts."""
+        try:
+            import openai
+        except Exception:
+            return ()
+        if hasattr(openai, 'RateLimitError'):
+            # APITimeoutError subclasses APIConnectionError; listed for clarity
+            return (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)
+        # Legacy `openai` module
+        error = getattr(openai, 'error', None)
+        if error is None:
+            return ()
+        return tuple(getattr(error, name) for name in ('RateLimitError', 'APIConnectionError', 'Timeout')
+                     if hasattr(error, name))
+
+    @classmethod
+    def _retry_policy(cls):
+        """
+        Keyword arguments for tenacity's `Retrying`/`AsyncRetrying`.
+
+        Up to 5 attempts with exponential backoff and jitter (1s initial, 30s cap), only for
+        transient API errors; any other exception propagates on the first failure.
+        """
+        try:
+            from tenacity import retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+        except Exception as e:
+            raise ImportError('tenacity not installed. Install with `pip install tenacity`.') from e
+        return dict(
+            stop=stop_after_attempt(5),
+            wait=wait_exponential_jitter(initial=1, max=30),
+            retry=retry_if_exception_type(cls._transient_errors()),
+            reraise=True,
+        )
+
+    def _cache_payload(self, prompt):
         """
-        # Build the prompt for the AI model
+        Build the cache payload for a prompt, or None when the response should not be cached.
+
+        Only deterministic (temperature == 0) calls with known model parameters are cached.
+        """
+        if self.cache is None or self.model_params is None:
+            return None
+        if self.model_params.get("temperature") != 0:
+            return None
+        return {**self.model_params, "prompt": prompt}
+
+    @staticmethod
+    def _context_lines(context):
+        """Prompt lines for the optional analysis context; empty when there is none."""
+        if not context:
+            return []
+        lines = ["", "Additional Analysis Context:"]
+        if isinstance(context, dict):
+            lines.extend(f"- {k}: {v}" for k, v in context.items())
+        else:
+            lines.append(str(context))
+        return lines
+
+    @classmethod
+    def _build_prompt(cls, csv_data, context=None):
+        """Build the analyst prompt from the stringified summary and optional context."""
         prompt_parts = [
             "You are a data analyst.",
             "Given the following CSV summary/data, provide a concise, clear analysis and actionable insights.",
@@ -66,62 +214,383 @@ class AiSummary:
         ]
         
         # Add any additional context
-        if context:
-            prompt_parts.extend(["", "Additional Analysis Context:"])
-            if isinstance(context, dict):
-                for k, v in context.items():
-                    prompt_parts.append(f"- {k}: {v}")
-            else:
-                prompt_parts.append(str(context))
+        prompt_parts.extend(cls._context_lines(context))
         
         # Final instructions for the model
         prompt = "\n".join(prompt_parts)
         print('-----------------------Prompt--------------------------------')
         print(prompt)
         print('-------------------------------------------------------')
-        # Try calling the model and be tolerant of a few common response shapes.
-        max_retries = 2
-        last_exc = None
-        for attempt in range(max_retries):
-            try:
-                response = None
-                # Common interfaces
-                if hasattr(self.model, 'complete'):
-                    # simple wrapper-style API
-                    response = self.model.complete(prompt)
-                elif hasattr(self.model, 'generate'):
-                    response = self.model.generate(prompt)
-                elif callable(self.model):
-                    response = self.model(prompt)
-                else:
-                    raise RuntimeError('Unsupported model interface: provide .complete, .generate, or a callable')
-
-                # Extract textual content from OpenAI ChatCompletion response
-                report = None
-
-                # New-style OpenAI client (response is ChatCompletion object)
-                if hasattr(response, 'choices') and hasattr(response.choices[0], 'message'):
-                    report = response.choices[0].message.content
-                # Legacy dict-style response
-                elif isinstance(response, dict) and 'choices' in response:
-                    message = response['choices'][0].get('message', {})
-                    report = message.get('content')
-                # Fallback for other response types
-                elif hasattr(response, 'text'):
-                    report = response.text
+        return prompt
+
+    def _call_model(self, prompt):
+        """Dispatch the prompt to whichever synchronous interface the model exposes."""
+        # Common interfaces
+        if hasattr(self.model, 'complete'):
+            # simple wrapper-style API
+            return self.model.complete(prompt)
+        elif hasattr(self.model, 'generate'):
+            return self.model.generate(prompt)
+        elif callable(self.model):
+            return self.model(prompt)
+        raise RuntimeError('Unsupported model interface: provide .complete, .generate, or a callable')
+
+    async def _acall_model(self, prompt):
+        """Await the async model, or run the sync one in a worker thread if none was given."""
+        if self.amodel is not None:
+            return await self.amodel(prompt)
+        return await asyncio.to_thread(self._call_model, prompt)
+
+    @staticmethod
+    def _extract_report(response):
+        """Extract trimmed text from the common response shapes, tolerating SDK differences."""
+        # New-style OpenAI client (response is ChatCompletion object)
+        if hasattr(response, 'choices') and hasattr(response.choices[0], 'message'):
+            report = response.choices[0].message.content
+        # Legacy dict-style response
+        elif isinstance(response, dict) and 'choices' in response:
+            message = response['choices'][0].get('message', {})
+            report = message.get('content')
+        # Fallback for other response types
+        elif hasattr(response, 'text'):
+            report = response.text
+        else:
+            report = str(response)
+
+        if report is None:
+            raise ValueError('Model response did not contain extractable text')
+        return report.strip()
+
+    def _cache_lookup(self, prompt):
+        """Return (cache_payload, cached_report); both None when caching doesn't apply."""
+        cache_payload = self._cache_payload(prompt)
+        if cache_payload is None:
+            return None, None
+        cached_report = self.cache.get(cache_payload)
+        if cached_report is not None:
+            print("LLM cache hit, skipping model call")
+        return cache_payload, cached_report
+
+    def generate_ai_summary(self, csv_data, context=None):
+        """
+        Generate the ai summary report of any CSV dataset.
+        
+        :param csv_data: stringified summary of the csv data
+        :param context: optional dict, containing additional analysis parameters or requirements
+                       e.g., {'focus_columns': ['col1', 'col2'], 'target_variable': 'target'}
+        :return: str, ai summary report, or None if rate limits/connection errors outlasted the retries
+        """
+        prompt = self._build_prompt(csv_data, context)
+        self.last_report_complete = False
+        cache_payload, cached_report = self._cache_lookup(prompt)
+        if cached_report is not None:
+            self.last_report_complete = True
+            return cached_report
+
+        from tenacity import Retrying
+
+        # Back off and retry on rate limits/connection errors; a transient error that outlasts
+        # the retries returns None, anything else propagates.
+        try:
+            report = Retrying(**self._retry_policy())(lambda: self._extract_report(self._call_model(prompt)))
+        except self._transient_errors() as e:
+            print(f"\nLLM call failed after retries: {e}")
+            return None
+
+        self.last_report_complete = True
+        if cache_payload is not None:
+            self.cache.set(cache_payload, report)
+        return report
+
+    def stream_ai_summary(self, csv_data, context=None, sink=None):
+        """
+        Stream the ai summary report, writing text to `sink` as tokens arrive.
+
+        Falls back to a single non-streamed call for models without streaming support.
+
+        :param csv_data: stringified summary of the csv data
+        :param context: optional dict, containing additional analysis parameters or requirements
+        :param sink: writable text stream (e.g. an open file); may be None
+        :return: str, full ai summary report (partial if the stream was cut off, see
+            `last_report_complete`), or None if transient errors outlasted the retries
+        """
+        if not self.supports_stream:
+            report = self.generate_ai_summary(csv_data, context)
+            if report is not None and sink is not None:
+                sink.write(report)
+            return report
+
+        prompt = self._build_prompt(csv_data, context)
+        self.last_report_complete = False
+        cache_payload, cached_report = self._cache_lookup(prompt)
+        if cached_report is not None:
+            self.last_report_complete = True
+            if sink is not None:
+                sink.write(cached_report)
+            return cached_report
+
+        pieces = []
+        completed = False
+        from tenacity import Retrying
+
+        try:
+            # Only opening the stream is retried; a stream cut off midway keeps its partial text
+            stream = Retrying(**self._retry_policy())(self.model, prompt, stream=True)
+            for chunk in stream:
+                # New-style chunk objects, or legacy dict chunks
+                if isinstance(chunk, dict):
+                    choices = chunk.get('choices') or [{}]
+                    text = choices[0].get('delta', {}).get('content')
                 else:
-                    report = str(response)
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                if not text:
+                    continue
+                pieces.append(text)
+                if sink is not None:
+                    sink.write(text)
+            completed = True
+        except Exception as e:
+            # Before the first chunk only transient errors (after retries) are swallowed;
+            # auth, bad-request and similar errors propagate like in `generate_ai_summary`.
+            # Once text has arrived, any error keeps the partial report.
+            if not pieces and not isinstance(e, self._transient_errors()):
+                raise
+            print(f"\nLLM streaming call failed: {e}")
+            if not pieces:
+                return None
+
+        report = "".join(pieces).strip()
+        self.last_report_complete = completed and bool(report)
+        # Never cache a response that was cut off mid-stream
+        if cache_payload is not None and report and completed:
+            self.cache.set(cache_payload, report)
+        return report
+
+    async def agenerate_ai_summary(self, csv_data, context=None):
+        """
+        Async variant of `generate_ai_summary`, so several prompts can run concurrently.
+
+        :param csv_data: stringified summary of the csv data
+        :param context: optional dict, containing additional analysis parameters or requirements
+        :return: str, ai summary report, or None if transient errors outlasted the retries
+        """
+        self.last_report_complete = False
+        # Set here rather than in `_acomplete`, whose section prompts run concurrently
+        report = await self._acomplete(self._build_prompt(csv_data, context))
+        self.last_report_complete = report is not None
+        return report
+
+    async def _acomplete(self, prompt):
+        """Run one prompt through the cache and the async model; None if transient errors outlasted the retries."""
+        # Cache backends do blocking disk/Redis I/O (and embedding), so keep them off the loop
+        cache_payload, cached_report = await asyncio.to_thread(self._cache_lookup, prompt)
+        if cached_report is not None:
+            return cached_report
+
+        from tenacity import AsyncRetrying
+
+        async def attempt():
+            return self._extract_report(await self._acall_model(prompt))
+
+        try:
+            report = await AsyncRetrying(**self._retry_policy())(attempt)
+        except self._transient_errors() as e:
+            print(f"\nLLM call failed after retries: {e}")
+            return None
+
+        if cache_payload is not None:
+            await asyncio.to_thread(self.cache.set, cache_payload, report)
+        return report
+
+    # (stats key, sub-key or None, section title) in report order
+    _SECTIONS = [
+        ("basic_stats", None, "Dataset Overview"),
+        ("numeric_stats", "distributions", "Numeric Distributions"),
+        ("numeric_stats", "top_correlations", "Numeric Correlations"),
+        ("categorical_stats", None, "Categorical Columns"),
+        ("datetime_stats", None, "Datetime Ranges"),
+    ]
+
+    @classmethod
+    def _build_section_prompts(cls, basic_text_dict, context=None):
+        """
+        Split the basic statistics into independent per-section prompts.
 
-                if report is None:
-                    raise ValueError('Model response did not contain extractable text')
+        Smaller prompts can be answered concurrently and are cached independently, so a
+        change in one column's stats only invalidates the sections that contain it.
 
-                # Trim and return the text
-                return report.strip()
-            except Exception as e:
-                last_exc = e
-                # small backoff could be added here
+        :param basic_text_dict: dict with basic_stats, numeric_stats, categorical_stats, datetime_stats
+        :param context: optional dict of additional analysis parameters, appended to every prompt
+        :return: list of (section title, prompt) tuples, skipping empty sections
+        """
+        from src.stats_format import render_section_markdown
+
+        section_prompts = []
+        for key, sub_key, title in cls._SECTIONS:
+            section = basic_text_dict.get(key) or {}
+            if sub_key == "distributions":
+                section = {k: v for k, v in section.items() if k != "top_correlations"}
+            elif sub_key is not None:
+                section = section.get(sub_key)
+            if not section:
                 continue
+            section_text = render_section_markdown(key, sub_key, section)
+            if not section_text:
+                continue
+            prompt_parts = [
+                "You are a data analyst.",
+                f"Given the following {title.lower()} section of a CSV dataset summary, "
+                "provide a concise, clear analysis and actionable insights for this aspect only.",
+                f"{title}:",
+                section_text,
+            ] + cls._context_lines(context)
+            section_prompts.append((title, "\n".join(prompt_parts)))
+        return section_prompts
+
+    async def agenerate_section_summaries(self, basic_text_dict, context=None, max_concurrency=4):
+        """
+        Summarize each statistics section with its own prompt, concurrently, and stitch the results.
+
+        :param basic_text_dict: dict with basic_stats, numeric_stats, categorical_stats, datetime_stats
+        :param context: optional dict of additional analysis parameters
+        :param max_concurrency: max in-flight requests; size it to the OpenAI tier's rate limits
+        :return: str, combined ai summary report, or None if every section failed
+        """
+        section_prompts = self._build_section_prompts(basic_text_dict, context)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(prompt):
+            async with semaphore:
+                return await self._acomplete(prompt)
+
+        results = await asyncio.gather(*(run(prompt) for _, prompt in section_prompts))
+        self.last_report_complete = all(results)
+        return self._stitch_sections(section_prompts, results)
+
+    @staticmethod
+    def _stitch_sections(section_prompts, results):
+        """Join per-section reports under their titles, skipping failed ones; None if every section failed."""
+        parts = [f"{title}\n{report}" for (title, _), report in zip(section_prompts, results) if report]
+        if not parts:
+            return None
+        return "\n\n".join(parts)
+
+    def submit_batch(self, prompts):
+        """
+        Submit prompts to the OpenAI Batch API (half price, results within 24h).
+
+        :param prompts: list of prompt strings; results keep this order
+        :return: str, batch id to pass to `fetch_batch`
+        :raises RuntimeError: if the model wasn't built by `get_ai_model` on a Batch-capable SDK
+        """
+        import io
+        import json
+
+        if self.client is None or self.model_params is None:
+            raise RuntimeError('Batch API requires a model created by get_ai_model with the new-style OpenAI SDK')
+
+        lines = []
+        for idx, prompt in enumerate(prompts):
+            lines.append(json.dumps({
+                "custom_id": f"prompt-{idx}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_params["model_name"],
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": self.model_params["max_tokens"],
+                    "temperature": self.model_params["temperature"],
+                },
+            }))
+        batch_file = io.BytesIO("\n".join(lines).encode("utf-8"))
+        uploaded = self.client.files.create(file=("batch_input.jsonl", batch_file), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        print(f"Submitted batch {batch.id} with {len(prompts)} prompts")
+        return batch.id
+
+    def fetch_batch(self, batch_id, poll_interval=30.0, timeout=None):
+        """
+        Poll a batch until it finishes and return its reports.
+
+        :param batch_id: id returned by `submit_batch`
+        :param poll_interval: seconds between status checks
+        :param timeout: optional max seconds to wait before raising TimeoutError
+        :return: list of report strings (None for failed requests), in submission order
+        :raises RuntimeError: if the batch failed, expired or was cancelled
+        """
+        import json
+        import time
+
+        started = time.monotonic()
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Batch {batch_id} ended with status {batch.status!r}")
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(f"Batch {batch_id} still {batch.status!r} after {timeout}s")
+            time.sleep(poll_interval)
+
+        reports = {}
+        if batch.output_file_id:
+            output = self.client.files.content(batch.output_file_id).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                try:
+                    reports[record["custom_id"]] = self._extract_report(response["body"])
+                except Exception:
+                    continue
+        if batch.request_counts is not None:
+            total = batch.request_counts.total
+        else:
+            total = max((int(key.split("-")[1]) + 1 for key in reports), default=0)
+        return [reports.get(f"prompt-{idx}") for idx in range(total)]
+
+    def generate_batch_summaries(self, basic_text_dict, context=None, poll_interval=30.0, timeout=None):
+        """
+        Non-interactive counterpart of `agenerate_section_summaries` using the Batch API.
+
+        Sections already in the LLM cache are not resubmitted; the rest are sent as one batch.
+
+        :param basic_text_dict: dict with basic_stats, numeric_stats, categorical_stats, datetime_stats
+        :param context: optional dict of additional analysis parameters
+        :param poll_interval: seconds between batch status checks
+        :param timeout: optional max seconds to wait for the batch
+        :return: str, combined ai summary report, or None if every section failed
+        """
+        section_prompts = self._build_section_prompts(basic_text_dict, context)
+        results = [None] * len(section_prompts)
+        pending = []
+        for idx, (_, prompt) in enumerate(section_prompts):
+            cache_payload, cached_report = self._cache_lookup(prompt)
+            if cached_report is not None:
+                results[idx] = cached_report
+            else:
+                pending.append((idx, prompt, cache_payload))
+
+        if pending:
+            batch_id = self.submit_batch([prompt for _, prompt, _ in pending])
+            reports = self.fetch_batch(batch_id, poll_interval=poll_interval, timeout=timeout)
+            for (idx, _, cache_payload), report in zip(pending, reports):
+                results[idx] = report
+                if report is not None and cache_payload is not None:
+                    self.cache.set(cache_payload, report)
+
+        self.last_report_complete = all(results)
+        return self._stitch_sections(section_prompts, results)
 
-        # If we reach here, model calls failed — return Null
-        print(f"\nLLM call failed after {max_retries} attempts: {last_exc}")
-        return None
+    async def aclose(self):
+        """Close the async HTTP client created by `get_ai_model`, if any."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
@@ -1,71 +1,246 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src._kernels import col_moments, entropy
+
+
+@dataclass
+class FrameContext:
+    """
+    Column selections and full-frame scans shared by the stats and visualization steps.
+
+    Build it once per DataFrame with `FrameContext.from_frame(df)` and pass it to both
+    `DataIngestion.generate_basic_stats` and `generate_visualizations`.
+    """
+    numeric_cols: pd.Index
+    categorical_cols: pd.Index
+    datetime_cols: pd.Index
+    nulls_per_col: pd.Series
+    numeric_block: np.ndarray  # (rows, len(numeric_cols)) float64, NaN for missing values
+    corr_matrix: Optional[np.ndarray] = None  # Pearson correlations; None with < 2 numeric columns
+    dtypes: Optional[pd.Series] = None  # column dtypes as the caller sees them
+    memory_usage_mb: Optional[float] = None  # deep memory usage of the caller's frame
+
+    @classmethod
+    def from_frame(cls, df, source=None):
+        """
+        Scan the DataFrame once for dtypes, null counts, the numeric block and its correlations.
+
+        :param df: pandas.DataFrame to analyze
+        :param source: the caller's original frame when `df` is a dtype-optimized copy of it;
+                       the reported dtypes and memory usage are taken from it, not the copy
+        :return: FrameContext
+        """
+        if source is None:
+            source = df
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_block = df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(
+            numeric_cols=numeric_cols,
+            categorical_cols=df.select_dtypes(include=['object', 'category', 'bool']).columns,
+            datetime_cols=df.select_dtypes(include=['datetime64']).columns,
+            nulls_per_col=df.isnull().sum(),
+            numeric_block=numeric_block,
+            corr_matrix=_correlation_matrix(numeric_block),
+            dtypes=source.dtypes,
+            memory_usage_mb=source.memory_usage(deep=True).sum() / (1024 * 1024),
+        )
+
+
+def _correlation_matrix(numeric_block):
+    """
+    Pearson correlation matrix of the block's columns, or None with fewer than two columns.
+
+    Uses `np.corrcoef` directly when there are no missing values; pandas' pairwise-complete
+    handling is only needed (and only paid for) when NaNs are present.
+    """
+    if numeric_block.shape[1] < 2:
+        return None
+    if len(numeric_block) < 2:
+        # Undefined with fewer than two observations (pandas also returns all-NaN)
+        return np.full((numeric_block.shape[1],) * 2, np.nan)
+    if not np.isnan(numeric_block).any():
+        # Constant columns give NaN correlations, as in pandas; silence the divide warning
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.corrcoef(numeric_block, rowvar=False)
+    return pd.DataFrame(numeric_block, copy=False).corr().to_numpy()
+
+
+@dataclass
+class DatasetStats:
+    """
+    Statistics returned by `DataIngestion.generate_basic_stats`.
+
+    `numeric_stats` keeps NumPy arrays aligned with `numeric_stats["columns"]` rather than
+    per-cell dicts; serialize with `src.stats_format.dumps_stats(vars(stats))`.
+    """
+    basic_stats: dict
+    numeric_stats: dict
+    categorical_stats: dict
+    datetime_stats: dict
+
+
+def _numeric_summary(X):
+    """
+    Compute `describe()`, `skew()` and `kurtosis()` equivalents for a 2-D float block.
+
+    The moments come from one set of power sums (`_kernels.col_moments`, Numba-compiled
+    when available) instead of three separate pandas passes; skew and kurtosis use the
+    same bias-corrected estimators as pandas.
+
+    :param X: (rows, columns) float64 array, NaN for missing values
+    :return: (describe-style dict of per-stat arrays, skew array, kurtosis array), each
+             aligned with the block's columns
+    """
+    import warnings
+
+    mask = ~np.isnan(X)
+    # Shift each column by its first valid value so the raw power sums stay well conditioned
+    if len(X):
+        shift = X[mask.argmax(axis=0), np.arange(X.shape[1])]
+    else:
+        shift = np.zeros(X.shape[1])
+    shift = np.where(np.isnan(shift), 0.0, shift)
+    s1, s2, s3, s4, n = col_moments(X, shift).T
+
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mu = s1 / n
+        # Central moment sums derived from the raw power sums
+        m2 = s2 - n * mu ** 2
+        m3 = s3 - 3 * mu * s2 + 2 * n * mu ** 3
+        m4 = s4 - 4 * mu * s3 + 6 * mu ** 2 * s2 - 3 * n * mu ** 4
+        # Treat floating-point residue as zero, as pandas does
+        m2[np.abs(m2) < 1e-14] = 0.0
+        m3[np.abs(m3) < 1e-14] = 0.0
+        m4[np.abs(m4) < 1e-14] = 0.0
+
+        std = np.sqrt(m2 / (n - 1))
+        skew = (n * np.sqrt(n - 1) / (n - 2)) * m3 / m2 ** 1.5
+        kurt = (n * (n + 1) * (n - 1) * m4) / ((n - 2) * (n - 3) * m2 ** 2) - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        skew = np.where(m2 == 0, 0.0, skew)
+        kurt = np.where(m2 == 0, 0.0, kurt)
+        skew[n < 3] = np.nan
+        kurt[n < 4] = np.nan
+
+        if len(X):
+            q25, q50, q75 = np.nanpercentile(X, [25, 50, 75], axis=0)
+            col_min, col_max = np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+        else:
+            q25 = q50 = q75 = col_min = col_max = np.full(X.shape[1], np.nan)
+
+    desc_stats = {
+        "count": n, "mean": shift + mu, "std": std, "min": col_min,
+        "25%": q25, "50%": q50, "75%": q75, "max": col_max,
+    }
+    return desc_stats, skew, kurt
+
+
+def top_value_counts(series, n):
+    """
+    The n most frequent non-null values of a Series, without sorting every unique value.
+
+    Counts come from an unsorted hash-based `value_counts(sort=False)`; `np.argpartition`
+    then selects the top n in O(K). Ties keep first-appearance order, as with
+    `value_counts().head(n)`.
+
+    :param series: pandas.Series to count
+    :param n: number of values to return
+    :return: (labels list, counts ndarray of the top n, counts ndarray of every observed value)
+    """
+    value_counts = series.value_counts(sort=False, dropna=True)
+    counts = value_counts.to_numpy()
+    observed = counts > 0  # drop unused categories of a category dtype
+    labels, counts = value_counts.index[observed], counts[observed]
+    if len(counts) > n:
+        threshold = counts[np.argpartition(counts, len(counts) - n)[len(counts) - n]]
+        candidates = np.flatnonzero(counts >= threshold)
+    else:
+        candidates = np.arange(len(counts))
+    top = candidates[np.argsort(-counts[candidates], kind='stable')[:n]]
+    return labels[top].tolist(), counts[top], counts
+
+
 class DataIngestion:
     def __init__(self):
         print('DataIngestion class initialized')
 
     @classmethod
-    def generate_basic_stats(self, csv_data, context=None):
+    def generate_basic_stats(self, csv_data, context=None, ctx=None):
         """
         Generate a comprehensive summary report of any CSV dataset.
         
         :param csv_data: pandas.DataFrame, the input CSV data to analyze
         :param context: optional dict, containing additional analysis parameters or requirements
                        e.g., {'focus_columns': ['col1', 'col2'], 'target_variable': 'target'}
-        :return: str, detailed summary report with statistics and insights
+        :param ctx: optional FrameContext for csv_data, shared with the visualization step
+        :return: DatasetStats with basic, numeric, categorical and datetime statistics
         """
-        import numpy as np
-        
+        if ctx is None:
+            ctx = FrameContext.from_frame(csv_data)
+        nulls = ctx.nulls_per_col
+
         # Generate basic dataset statistics
         basic_stats = {
             "rows": len(csv_data),
             "columns": len(csv_data.columns),
-            "missing_values": csv_data.isnull().sum().to_dict(),
-            "dtypes": csv_data.dtypes.to_dict(),
-            "memory_usage": csv_data.memory_usage(deep=True).sum() / (1024 * 1024)  # MB
+            "missing_values": nulls.to_dict(),
+            "dtypes": ctx.dtypes.to_dict(),
+            "memory_usage": ctx.memory_usage_mb  # MB
         }
         # Identify numeric and categorical columns
-        numeric_cols = csv_data.select_dtypes(include=['int64', 'float64']).columns
-        categorical_cols = csv_data.select_dtypes(include=['object', 'category', 'bool']).columns
-        datetime_cols = csv_data.select_dtypes(include=['datetime64']).columns
+        numeric_cols = ctx.numeric_cols
+        categorical_cols = ctx.categorical_cols
+        datetime_cols = ctx.datetime_cols
         
         # Generate descriptive statistics for numeric columns
         numeric_stats = {}
         if len(numeric_cols) > 0:
-            desc_stats = csv_data[numeric_cols].describe()
+            desc_stats, skew, kurtosis = _numeric_summary(ctx.numeric_block)
+            # Stats stay as arrays aligned with "columns"; serialized directly by stats_format
             numeric_stats = {
-                "basic": desc_stats.to_dict(),
-                "skew": csv_data[numeric_cols].skew().to_dict(),
-                "kurtosis": csv_data[numeric_cols].kurtosis().to_dict()
+                "columns": numeric_cols.tolist(),
+                "basic": desc_stats,
+                "skew": skew,
+                "kurtosis": kurtosis
             }
             
             # Calculate correlations if there are multiple numeric columns
             if len(numeric_cols) > 1:
-                corr_matrix = csv_data[numeric_cols].corr()
-                # Get top 5 strongest correlations (excluding self-correlations)
-                correlations = []
-                for i in range(len(numeric_cols)):
-                    for j in range(i + 1, len(numeric_cols)):
-                        correlations.append({
-                            'col1': numeric_cols[i],
-                            'col2': numeric_cols[j],
-                            'correlation': corr_matrix.iloc[i, j]
-                        })
-                correlations.sort(key=lambda x: abs(x['correlation']), reverse=True)
-                numeric_stats["top_correlations"] = correlations[:5]
+                # Get top 5 strongest correlations (excluding self-correlations) from the upper triangle
+                arr = ctx.corr_matrix
+                iu, ju = np.triu_indices_from(arr, k=1)
+                vals = arr[iu, ju]
+                strength = np.abs(vals)
+                strength[np.isnan(strength)] = -1.0  # undefined correlations rank last
+                # Select by threshold rather than argpartition, which reorders ties: every pair at
+                # least as strong as the 5th strongest, kept in (i, j) order, then stable-sorted
+                k = min(5, len(vals))
+                threshold = np.partition(strength, len(strength) - k)[len(strength) - k]
+                candidates = np.flatnonzero(strength >= threshold)
+                idx = candidates[np.argsort(-strength[candidates], kind='stable')[:k]]
+                col_names = numeric_cols.values
+                numeric_stats["top_correlations"] = [
+                    {'col1': col_names[iu[i]], 'col2': col_names[ju[i]], 'correlation': vals[i]}
+                    for i in idx
+                ]
         
         # Generate statistics for categorical columns
         categorical_stats = {}
         for col in categorical_cols:
-            value_counts = csv_data[col].value_counts()
-            unique_count = len(value_counts)
+            top_labels, top_counts, counts = top_value_counts(csv_data[col], 5)
+            unique_count = len(counts)
             categorical_stats[col] = {
                 "unique_values": unique_count,
-                "top_5_values": value_counts.head().to_dict(),
-                "null_count": csv_data[col].isnull().sum(),
+                "top_5_values": dict(zip(top_labels, top_counts.tolist())),
+                "null_count": nulls[col],
                 "is_binary": unique_count == 2
             }
             if unique_count < 50:  # Only calculate entropy for reasonable cardinality
-                probs = value_counts / len(csv_data)
-                categorical_stats[col]["entropy"] = -np.sum(probs * np.log2(probs))
+                categorical_stats[col]["entropy"] = entropy(counts)
         
         # Datetime analysis if present
         datetime_stats = {}
@@ -74,8 +249,8 @@ class DataIngestion:
                 "min": csv_data[col].min(),
                 "max": csv_data[col].max(),
                 "range_days": (csv_data[col].max() - csv_data[col].min()).days,
-                "null_count": csv_data[col].isnull().sum()
+                "null_count": nulls[col]
             }
         
         # Return the computed statistics so callers can use them directly
-        return basic_stats, numeric_stats, categorical_stats, datetime_stats
+        return DatasetStats(basic_stats, numeric_stats, categorical_stats, datetime_stats)
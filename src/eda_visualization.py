@@ -1,181 +1,389 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 from typing import List, Optional
 
-# Set style for visualizations
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+from src.data_ingestion import FrameContext, top_value_counts
 
+# Figures are embedded in the PDF at 6 x 4 inches; 120 DPI keeps them sharp on screen and in
+# print previews at a fraction of the 300 DPI rasterize/encode cost. Layout is handled by
+# tight_layout(), so savefig doesn't need the extra bbox_inches='tight' render pass.
+_DPI = 120
 
-def generate_visualizations(df: pd.DataFrame, output_dir: Optional[Path] = None) -> List[str]:
+
+@lru_cache(maxsize=None)
+def _pyplot():
+    """
+    Import and configure matplotlib/seaborn on first use (once per process).
+
+    Kept out of module scope so importing this module, or only computing stats, doesn't
+    pay the plotting libraries' import time.
+    """
+    import matplotlib
+    matplotlib.use("Agg")  # headless backend; figures are rendered off the main thread and in worker processes
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set style for visualizations
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['font.size'] = 10
+    return plt, sns
+
+
+# Per-thread pool of reusable figures: (figsize, n_rows, n_cols) -> (fig, axes, subplot specs).
+# Building a Figure and its artist tree is the expensive part of a plot, so figures are
+# cleared and redrawn instead of being recreated for every chart. The workers of the shared
+# process pool are long-lived and keep their figures across reports; in-process rendering
+# runs on a fresh `asyncio.to_thread` worker per report, so there the reuse is only across
+# the charts of one report. The pool is thread-local because a Figure can't be drawn by two
+# threads at once, e.g. when Streamlit sessions render reports in-process concurrently.
+_FIGURE_POOL = threading.local()
+_FIGURE_POOL_MAX = 8
+
+
+def _pooled_figure(figsize: tuple, n_rows: int = 1, n_cols: int = 1):
+    """
+    Return a cleared (fig, flat list of axes) from this thread's pool, creating it on first use.
+
+    Figures are built with `matplotlib.figure.Figure` rather than pyplot, so they are never
+    registered with (or closed by) the pyplot state machine.
+    """
+    _pyplot()  # applies the style before the first figure is built
+    pool = getattr(_FIGURE_POOL, 'figures', None)
+    if pool is None:
+        pool = _FIGURE_POOL.figures = {}
+    key = (tuple(figsize), n_rows, n_cols)
+    entry = pool.get(key)
+    if entry is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        if len(pool) >= _FIGURE_POOL_MAX:
+            pool.pop(next(iter(pool)))  # evict the oldest shape
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        axes = list(fig.subplots(n_rows, n_cols, squeeze=False).flat)
+        entry = (fig, axes, [ax.get_subplotspec() for ax in axes])
+        pool[key] = entry
+        return fig, axes
+
+    fig, axes, specs = entry
+    # tight_layout() of the previous chart moved the subplot margins; start from the defaults
+    import matplotlib
+    fig.subplots_adjust(**{name: matplotlib.rcParams[f'figure.subplot.{name}']
+                           for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+    # Drop axes added by the previous chart (e.g. a heatmap colorbar) and undo what charts
+    # change on the grid axes that `Axes.clear` leaves alone
+    for extra_ax in [ax for ax in fig.axes if not any(ax is grid_ax for grid_ax in axes)]:
+        fig.delaxes(extra_ax)
+    for ax, spec in zip(axes, specs):
+        ax.clear()
+        ax.set_subplotspec(spec)
+        ax.set_aspect('auto')
+        ax.set_anchor('C')
+        ax.set_visible(True)
+    return fig, axes
+
+
+def _grid_axes(n_items: int, n_cols: int, n_rows: int):
+    """Get an n_rows x n_cols subplot grid and return (fig, flat list of axes)."""
+    return _pooled_figure((15, 5 * n_rows), n_rows, n_cols)
+
+
+# Each figure is built by a top-level function taking only picklable inputs (numpy arrays,
+# lists, dicts) and an output path, so it can run in a worker process.
+
+def _fig_correlation(corr_matrix: np.ndarray, numeric_cols: List[str], path: Path) -> str:
+    _, sns = _pyplot()
+    fig, (ax,) = _pooled_figure((10, 8))
+    correlation_matrix = pd.DataFrame(corr_matrix, index=numeric_cols, columns=numeric_cols)
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
+               fmt='.2f', square=True, linewidths=0.5, cbar_kws={"shrink": 0.8}, ax=ax)
+    ax.set_title('Correlation Heatmap of Numeric Variables', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(path, dpi=_DPI)
+    return str(path)
+
+
+def _histogram_bins(numeric_block: np.ndarray) -> List[Optional[tuple]]:
+    """
+    30-bin (counts, edges) histogram of every column of the block, None for empty columns.
+
+    Computed before the figure jobs are submitted, so the workers receive the bins instead
+    of the full numeric block.
+    """
+    bins = []
+    for idx in range(numeric_block.shape[1]):
+        values = numeric_block[:, idx]
+        values = values[~np.isnan(values)]
+        bins.append(np.histogram(values, bins=30) if values.size else None)
+    return bins
+
+
+def _fig_histograms(histogram_bins: List[Optional[tuple]], numeric_cols: List[str], path: Path) -> str:
+    n_cols = min(3, len(numeric_cols))
+    n_rows = (len(numeric_cols) + n_cols - 1) // n_cols
+    fig, axes = _grid_axes(len(numeric_cols), n_cols, n_rows)
+
+    for idx, col in enumerate(numeric_cols):
+        if idx < len(axes):
+            if histogram_bins[idx] is not None:
+                # Draw the precomputed bins as bars; this is what `hist` does internally
+                counts, edges = histogram_bins[idx]
+                axes[idx].bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                              color='skyblue', edgecolor='black', alpha=0.7)
+            axes[idx].set_title(f'Distribution of {col}', fontweight='bold')
+            axes[idx].set_xlabel(col)
+            axes[idx].set_ylabel('Frequency')
+            axes[idx].grid(True, alpha=0.3)
+
+    # Hide unused subplots
+    for idx in range(len(numeric_cols), len(axes)):
+        axes[idx].set_visible(False)
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=_DPI)
+    return str(path)
+
+
+def _box_stats(numeric_block: np.ndarray) -> List[Optional[dict]]:
+    """
+    Box plot statistics for every column of the block, in the format `Axes.bxp` expects.
+
+    Quartiles for all columns come from one `np.nanpercentile` call; whiskers extend to the
+    furthest points within 1.5 IQR of the box and values beyond them are fliers, matching
+    the defaults of `Axes.boxplot`. Columns with no values map to None. Like the histogram
+    bins, these are computed before the jobs are submitted so workers get only the summaries.
+    """
+    if len(numeric_block) == 0:
+        return [None] * numeric_block.shape[1]
+    with np.errstate(invalid='ignore'):
+        q1, med, q3 = np.nanpercentile(numeric_block, [25, 50, 75], axis=0)
+    stats = []
+    for idx in range(numeric_block.shape[1]):
+        values = numeric_block[:, idx]
+        values = values[~np.isnan(values)]
+        if not values.size:
+            stats.append(None)
+            continue
+        iqr = q3[idx] - q1[idx]
+        lo_limit, hi_limit = q1[idx] - 1.5 * iqr, q3[idx] + 1.5 * iqr
+        inside = values[(values >= lo_limit) & (values <= hi_limit)]
+        stats.append({
+            'med': med[idx], 'q1': q1[idx], 'q3': q3[idx],
+            'whislo': min(inside.min(), q1[idx]) if inside.size else q1[idx],
+            'whishi': max(inside.max(), q3[idx]) if inside.size else q3[idx],
+            'fliers': values[(values < lo_limit) | (values > hi_limit)],
+        })
+    return stats
+
+
+def _fig_boxplots(box_stats: List[Optional[dict]], numeric_cols: List[str], path: Path) -> str:
+    n_cols = min(3, len(numeric_cols))
+    n_rows = (len(numeric_cols) + n_cols - 1) // n_cols
+    fig, axes = _grid_axes(len(numeric_cols), n_cols, n_rows)
+
+    for idx, col in enumerate(numeric_cols):
+        if idx < len(axes):
+            if box_stats[idx] is not None:
+                axes[idx].bxp([box_stats[idx]], vert=True)
+            axes[idx].set_title(f'Box Plot of {col}', fontweight='bold')
+            axes[idx].set_ylabel(col)
+            axes[idx].grid(True, alpha=0.3)
+
+    # Hide unused subplots
+    for idx in range(len(numeric_cols), len(axes)):
+        axes[idx].set_visible(False)
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=_DPI)
+    return str(path)
+
+
+def _fig_categorical(top_categories: List[tuple], path: Path) -> str:
+    """top_categories: [(column, category labels, counts)] with at most 10 categories each."""
+    n_cat_cols = min(3, len(top_categories))
+    n_cat_rows = (len(top_categories) + n_cat_cols - 1) // n_cat_cols
+    fig, axes = _grid_axes(len(top_categories), n_cat_cols, n_cat_rows)
+
+    for idx, (col, labels, counts) in enumerate(top_categories):
+        if idx < len(axes):
+            axes[idx].barh(range(len(counts)), counts, color='lightcoral')
+            axes[idx].set_yticks(range(len(counts)))
+            axes[idx].set_yticklabels(labels)
+            axes[idx].set_title(f'Top 10: {col}', fontweight='bold')
+            axes[idx].set_xlabel('Count')
+            axes[idx].grid(True, alpha=0.3, axis='x')
+
+    # Hide unused subplots
+    for idx in range(len(top_categories), len(axes)):
+        axes[idx].set_visible(False)
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=_DPI)
+    return str(path)
+
+
+def _fig_missing(missing_data: pd.Series, n_rows: int, path: Path) -> str:
+    fig, (ax,) = _pooled_figure((12, 6))
+    if missing_data.sum() > 0:
+        missing_data_pct = (missing_data / n_rows) * 100
+        missing_data_pct = missing_data_pct[missing_data_pct > 0].sort_values(ascending=False)
+        missing_data_pct.plot(kind='barh', color='orange', edgecolor='black', ax=ax)
+        ax.set_title('Missing Data Percentage by Column', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Percentage Missing (%)')
+        ax.grid(True, alpha=0.3, axis='x')
+    else:
+        ax.text(0.5, 0.5, 'No Missing Data Found',
+                horizontalalignment='center', verticalalignment='center',
+                fontsize=14, transform=ax.transAxes)
+        ax.set_title('Missing Data Analysis', fontsize=14, fontweight='bold')
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=_DPI)
+    return str(path)
+
+
+def _fig_dtypes(dtype_labels: List[str], dtype_counts: List[int], path: Path) -> str:
+    fig, (ax,) = _pooled_figure((10, 6))
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8']
+    ax.pie(dtype_counts, labels=dtype_labels,
+           autopct='%1.1f%%', colors=colors, startangle=90)
+    ax.set_title('Data Type Distribution', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(path, dpi=_DPI)
+    return str(path)
+
+
+# One worker pool for the life of the process. Workers are spawned rather than forked: the
+# pool is first used from `asyncio.to_thread`, and forking a process that runs other threads
+# (the event loop, Streamlit's server) can deadlock on locks held at fork time. Spawned
+# workers pay the pandas/matplotlib import once, then keep their pooled figures across reports.
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+_MAX_FIGURE_JOBS = 6
+
+
+def _figure_executor() -> Optional[ProcessPoolExecutor]:
+    """Return the shared figure process pool, or None when there is only one CPU."""
+    global _EXECUTOR
+    max_workers = min(_MAX_FIGURE_JOBS, os.cpu_count() or 1)
+    if max_workers <= 1:
+        return None
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            import multiprocessing
+            _EXECUTOR = ProcessPoolExecutor(max_workers=max_workers,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _EXECUTOR
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next report starts a fresh one."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is executor:
+            _EXECUTOR = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_figure_jobs(jobs: List[tuple]) -> List[str]:
+    """
+    Render figure jobs `(func, args)` in the shared process pool, returning paths in job order.
+
+    Falls back to rendering in-process when worker processes can't be started.
+    """
+    executor = _figure_executor() if len(jobs) > 1 else None
+    if executor is not None:
+        try:
+            futures = [executor.submit(func, *args) for func, args in jobs]
+            return [future.result() for future in futures]
+        except (BrokenProcessPool, OSError, PermissionError) as e:
+            print(f"Process pool unavailable ({e}); rendering visualizations sequentially")
+            _discard_executor(executor)
+    return [func(*args) for func, args in jobs]
+
+
+def generate_visualizations(df: pd.DataFrame, output_dir: Optional[Path] = None,
+                            ctx: Optional[FrameContext] = None, image_format: str = "png") -> List[str]:
     """
     Generate comprehensive EDA visualizations from a DataFrame.
-    
+
+    The figures are independent, so they are rendered concurrently in a process pool.
+
     Args:
         df: Input DataFrame to visualize
         output_dir: Directory to save visualization files. If None, uses a default 'visualizations' folder.
-    
+        ctx: Precomputed FrameContext for df (shared with the stats step). Built here if None.
+        image_format: File format for the charts, 'png' or 'svg'. SVG charts stay vector
+            graphics in the PDF report (smaller files, no resampling when scaled).
+
     Returns:
         List of paths to saved visualization files
     """
     if output_dir is None:
         output_dir = Path(__file__).resolve().parents[1] / "reports" / "visualizations"
-    
+
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
-    
-    saved_files = []
-    
+
+    if image_format not in ("png", "svg"):
+        raise ValueError(f"Unsupported image format: {image_format!r}")
+
+    if ctx is None:
+        ctx = FrameContext.from_frame(df)
+
     try:
+        numeric_cols = ctx.numeric_cols.tolist()
+        jobs = []
+        labels = []
+
         # 1. Correlation Heatmap
-        numeric_df = df.select_dtypes(include=[np.number])
-        if len(numeric_df.columns) > 1:
-            plt.figure(figsize=(10, 8))
-            correlation_matrix = numeric_df.corr()
-            sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, 
-                       fmt='.2f', square=True, linewidths=0.5, cbar_kws={"shrink": 0.8})
-            plt.title('Correlation Heatmap of Numeric Variables', fontsize=14, fontweight='bold')
-            plt.tight_layout()
-            heatmap_path = output_dir / "01_correlation_heatmap.png"
-            plt.savefig(heatmap_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            saved_files.append(str(heatmap_path))
-            print(f"✓ Saved correlation heatmap to {heatmap_path}")
-        
-        # 2. Histograms for numeric columns
-        numeric_cols = numeric_df.columns.tolist()
-        if numeric_cols:
-            n_cols = min(3, len(numeric_cols))
-            n_rows = (len(numeric_cols) + n_cols - 1) // n_cols
-            
-            fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows))
-            if n_rows == 1 and n_cols == 1:
-                axes = [axes]
-            else:
-                axes = axes.flatten() if hasattr(axes, 'flatten') else [axes]
-            
-            for idx, col in enumerate(numeric_cols):
-                if idx < len(axes):
-                    axes[idx].hist(numeric_df[col].dropna(), bins=30, color='skyblue', edgecolor='black', alpha=0.7)
-                    axes[idx].set_title(f'Distribution of {col}', fontweight='bold')
-                    axes[idx].set_xlabel(col)
-                    axes[idx].set_ylabel('Frequency')
-                    axes[idx].grid(True, alpha=0.3)
-            
-            # Hide unused subplots
-            for idx in range(len(numeric_cols), len(axes)):
-                axes[idx].set_visible(False)
-            
-            plt.tight_layout()
-            histograms_path = output_dir / "02_histograms.png"
-            plt.savefig(histograms_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            saved_files.append(str(histograms_path))
-            print(f"✓ Saved histograms to {histograms_path}")
-        
-        # 3. Box plots for numeric columns
+        if len(numeric_cols) > 1:
+            # Reuse the correlations computed for the stats step; workers only receive the K x K matrix
+            jobs.append((_fig_correlation, (ctx.corr_matrix, numeric_cols, output_dir / f"01_correlation_heatmap.{image_format}")))
+            labels.append("correlation heatmap")
+
+        # 2. Histograms and 3. Box plots for numeric columns
         if numeric_cols:
-            fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows))
-            if n_rows == 1 and n_cols == 1:
-                axes = [axes]
-            else:
-                axes = axes.flatten() if hasattr(axes, 'flatten') else [axes]
-            
-            for idx, col in enumerate(numeric_cols):
-                if idx < len(axes):
-                    axes[idx].boxplot(numeric_df[col].dropna(), vert=True)
-                    axes[idx].set_title(f'Box Plot of {col}', fontweight='bold')
-                    axes[idx].set_ylabel(col)
-                    axes[idx].grid(True, alpha=0.3)
-            
-            # Hide unused subplots
-            for idx in range(len(numeric_cols), len(axes)):
-                axes[idx].set_visible(False)
-            
-            plt.tight_layout()
-            boxplots_path = output_dir / "03_boxplots.png"
-            plt.savefig(boxplots_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            saved_files.append(str(boxplots_path))
-            print(f"✓ Saved box plots to {boxplots_path}")
-        
-        # 4. Categorical value counts
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            jobs.append((_fig_histograms, (_histogram_bins(ctx.numeric_block), numeric_cols, output_dir / f"02_histograms.{image_format}")))
+            labels.append("histograms")
+            jobs.append((_fig_boxplots, (_box_stats(ctx.numeric_block), numeric_cols, output_dir / f"03_boxplots.{image_format}")))
+            labels.append("box plots")
+
+        # 4. Categorical value counts (counted here so workers only receive the top 10 per column)
+        categorical_cols = ctx.categorical_cols.tolist()
         if categorical_cols:
-            n_cat_cols = min(3, len(categorical_cols))
-            n_cat_rows = (len(categorical_cols) + n_cat_cols - 1) // n_cat_cols
-            
-            fig, axes = plt.subplots(n_cat_rows, n_cat_cols, figsize=(15, 5 * n_cat_rows))
-            if n_cat_rows == 1 and n_cat_cols == 1:
-                axes = [axes]
-            else:
-                axes = axes.flatten() if hasattr(axes, 'flatten') else [axes]
-            
-            for idx, col in enumerate(categorical_cols):
-                if idx < len(axes):
-                    top_categories = df[col].value_counts().head(10)
-                    axes[idx].barh(range(len(top_categories)), top_categories.values, color='lightcoral')
-                    axes[idx].set_yticks(range(len(top_categories)))
-                    axes[idx].set_yticklabels(top_categories.index)
-                    axes[idx].set_title(f'Top 10: {col}', fontweight='bold')
-                    axes[idx].set_xlabel('Count')
-                    axes[idx].grid(True, alpha=0.3, axis='x')
-            
-            # Hide unused subplots
-            for idx in range(len(categorical_cols), len(axes)):
-                axes[idx].set_visible(False)
-            
-            plt.tight_layout()
-            categorical_path = output_dir / "04_categorical_distributions.png"
-            plt.savefig(categorical_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            saved_files.append(str(categorical_path))
-            print(f"✓ Saved categorical distributions to {categorical_path}")
-        
+            top_categories = []
+            for col in categorical_cols:
+                top_labels, top_counts, _ = top_value_counts(df[col], 10)
+                top_categories.append((col, top_labels, top_counts.tolist()))
+            jobs.append((_fig_categorical, (top_categories, output_dir / f"04_categorical_distributions.{image_format}")))
+            labels.append("categorical distributions")
+
         # 5. Missing data visualization
-        plt.figure(figsize=(12, 6))
-        missing_data = df.isnull().sum()
-        if missing_data.sum() > 0:
-            missing_data_pct = (missing_data / len(df)) * 100
-            missing_data_pct = missing_data_pct[missing_data_pct > 0].sort_values(ascending=False)
-            missing_data_pct.plot(kind='barh', color='orange', edgecolor='black')
-            plt.title('Missing Data Percentage by Column', fontsize=14, fontweight='bold')
-            plt.xlabel('Percentage Missing (%)')
-            plt.grid(True, alpha=0.3, axis='x')
-        else:
-            plt.text(0.5, 0.5, 'No Missing Data Found', 
-                    horizontalalignment='center', verticalalignment='center',
-                    fontsize=14, transform=plt.gca().transAxes)
-            plt.title('Missing Data Analysis', fontsize=14, fontweight='bold')
-        
-        plt.tight_layout()
-        missing_path = output_dir / "05_missing_data.png"
-        plt.savefig(missing_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        saved_files.append(str(missing_path))
-        print(f"✓ Saved missing data visualization to {missing_path}")
-        
+        jobs.append((_fig_missing, (ctx.nulls_per_col, len(df), output_dir / f"05_missing_data.{image_format}")))
+        labels.append("missing data visualization")
+
         # 6. Data type distribution
-        plt.figure(figsize=(10, 6))
-        dtype_counts = df.dtypes.value_counts()
-        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', '#98D8C8']
-        plt.pie(dtype_counts.values, labels=[str(dt) for dt in dtype_counts.index], 
-               autopct='%1.1f%%', colors=colors, startangle=90)
-        plt.title('Data Type Distribution', fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        dtype_path = output_dir / "06_datatype_distribution.png"
-        plt.savefig(dtype_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        saved_files.append(str(dtype_path))
-        print(f"✓ Saved data type distribution to {dtype_path}")
-        
+        dtype_counts = ctx.dtypes.value_counts()
+        jobs.append((_fig_dtypes, ([str(dt) for dt in dtype_counts.index], dtype_counts.values.tolist(),
+                                   output_dir / f"06_datatype_distribution.{image_format}")))
+        labels.append("data type distribution")
+
+        saved_files = _run_figure_jobs(jobs)
+        for label, path in zip(labels, saved_files):
+            print(f"✓ Saved {label} to {path}")
+
         print(f"\n✅ All visualizations saved to: {output_dir}")
         return saved_files
-        
+
     except Exception as e:
         print(f"❌ Error generating visualizations: {str(e)}")
-        raise
\ No newline at end of file
+        raise
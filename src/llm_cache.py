@@ -0,0 +1,360 @@
+"""
+Two-tier cache for LLM completions.
+
+Tier one is an exact-match lookup on a SHA-256 of the canonical request payload
+(model name, sampling parameters and prompt). Tier two is a semantic nearest-neighbour
+lookup over prompt embeddings, so re-running a report on the same or a very similar
+dataset can skip the LLM round-trip entirely.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / "reports" / ".llm_cache"
+
+# Similarity indexes shared by every LLMCache on the same store, keyed by `LLMCache._store_id`,
+# so a new cache per report doesn't re-read every entry. Guarded by _INDEX_LOCK.
+_INDEXES = {}
+_INDEX_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _load_embedder(model_name):
+    """
+    Load a sentence-transformers model once per process (loading can take seconds or download it).
+
+    :return: SentenceTransformer, or None if sentence-transformers isn't installed
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except Exception:
+        print("sentence-transformers not installed; semantic LLM cache disabled.")
+        return None
+    return SentenceTransformer(model_name)
+
+
+class _DictBackend:
+    """In-process backend; entries live as long as the interpreter."""
+
+    def __init__(self):
+        self._data = {}
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._data[key] = value
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def items(self):
+        return list(self._data.items())
+
+
+class _DiskBackend:
+    """One JSON file per entry under `cache_dir`; no extra dependencies required."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key):
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set(self, key, value, ttl=None):
+        # Write to a uniquely named temp file first, so a concurrent reader never sees a
+        # partial entry and concurrent writers of the same key don't share a temp file
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(value))
+            os.replace(tmp_name, self._path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def items(self):
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            value = self.get(path.stem)
+            if value is not None:
+                entries.append((path.stem, value))
+        return entries
+
+
+class _DiskCacheBackend:
+    """Backend on top of the `diskcache` package (SQLite-backed, process safe)."""
+
+    def __init__(self, cache_dir):
+        try:
+            import diskcache
+        except Exception as e:
+            raise ImportError('diskcache not installed. Install with `pip install diskcache` or use backend="disk".') from e
+        self._cache = diskcache.Cache(str(cache_dir))
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, expire=ttl)
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+    def items(self):
+        entries = []
+        for key in list(self._cache.iterkeys()):
+            value = self._cache.get(key)
+            if value is not None:
+                entries.append((key, value))
+        return entries
+
+
+class _RedisBackend:
+    """Backend on a shared Redis instance, useful when several app workers serve reports."""
+
+    prefix = "autoreport:llm_cache:"
+
+    def __init__(self, redis_url):
+        try:
+            import redis
+        except Exception as e:
+            raise ImportError('redis not installed. Install with `pip install redis` or use backend="disk".') from e
+        self._client = redis.Redis.from_url(redis_url or "redis://localhost:6379/0")
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self.prefix + key, json.dumps(value), ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def items(self):
+        entries = []
+        for raw_key in self._client.scan_iter(match=self.prefix + "*"):
+            key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+            value = self.get(key[len(self.prefix):])
+            if value is not None:
+                entries.append((key[len(self.prefix):], value))
+        return entries
+
+
+class LLMCache:
+    """
+    Cache LLM reports by exact request hash, falling back to prompt-embedding similarity.
+
+    Each stored entry is `{"params": <hash of model params>, "embedding": [...], "report": str,
+    "expires_at": float}`. The semantic tier only compares prompts sent with identical
+    model parameters, so switching models never returns another model's report.
+    """
+
+    def __init__(self, backend='disk', cache_dir=None, ttl=7 * 24 * 3600, similarity_threshold=0.92,
+                 semantic=False, redis_url=None, embedding_model='all-MiniLM-L6-v2'):
+        """
+        :param backend: 'dict' (in-memory), 'disk' (JSON files), 'diskcache' or 'redis'.
+        :param cache_dir: Directory for the on-disk backends (default: reports/.llm_cache).
+        :param ttl: Seconds an entry stays valid; None keeps entries forever.
+        :param similarity_threshold: Minimum cosine similarity for a semantic hit.
+        :param semantic: Enable the embedding tier (needs `sentence-transformers`). Off by default:
+            prompts that differ only in their numbers embed almost identically, so a semantic hit
+            can return another dataset's report.
+        :param redis_url: Connection URL for the 'redis' backend.
+        :param embedding_model: sentence-transformers model used to embed prompts.
+        """
+        cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        # Identifies the underlying store; the in-memory backend's store is this instance
+        self._store_id = None
+        if backend in ('disk', 'diskcache'):
+            self._store_id = (backend, str(cache_dir.resolve()))
+        elif backend == 'redis':
+            self._store_id = (backend, redis_url)
+        if backend == 'dict':
+            self.backend = _DictBackend()
+        elif backend == 'disk':
+            self.backend = _DiskBackend(cache_dir)
+        elif backend == 'diskcache':
+            self.backend = _DiskCacheBackend(cache_dir)
+        elif backend == 'redis':
+            self.backend = _RedisBackend(redis_url)
+        else:
+            raise ValueError(f"Unknown cache backend: {backend!r}")
+
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.semantic = semantic
+        self.embedding_model = embedding_model
+        self._embedder = None
+        # (prompt, embedding) of the latest lookup so a miss followed by set() embeds once
+        self._last_embedding = (None, None)
+        # params hash -> (list of keys, L2-normalized embedding matrix or FAISS index); shared
+        # process-wide for on-disk and Redis stores, built on the first semantic lookup
+        with _INDEX_LOCK:
+            self._index = _INDEXES.get(self._store_id) if self._store_id is not None else None
+
+    @staticmethod
+    def make_key(payload):
+        """
+        Hash a request payload into a stable cache key.
+
+        :param payload: dict with model_name, temperature, max_tokens and prompt.
+        :return: hex SHA-256 digest of the canonical JSON encoding.
+        """
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, payload):
+        """
+        Look up a cached report for the payload.
+
+        :param payload: dict with model_name, temperature, max_tokens and prompt.
+        :return: cached report text, or None on a miss.
+        """
+        entry = self.backend.get(self.make_key(payload))
+        if entry is not None and not self._expired(entry):
+            return entry["report"]
+
+        if not self.semantic:
+            return None
+        embedding = self._embed(payload["prompt"])
+        if embedding is None:
+            return None
+        return self._nearest(self._params_key(payload), embedding)
+
+    def set(self, payload, report):
+        """
+        Store a report for the payload.
+
+        :param payload: dict with model_name, temperature, max_tokens and prompt.
+        :param report: report text returned by the model.
+        """
+        key = self.make_key(payload)
+        params_key = self._params_key(payload)
+        embedding = self._embed(payload["prompt"]) if self.semantic else None
+        entry = {
+            "params": params_key,
+            "embedding": embedding.tolist() if embedding is not None else None,
+            "report": report,
+            "expires_at": time.time() + self.ttl if self.ttl else None,
+        }
+        self.backend.set(key, entry, ttl=self.ttl)
+        if embedding is not None:
+            with _INDEX_LOCK:
+                if self._index is None and self._store_id is not None:
+                    self._index = _INDEXES.get(self._store_id)
+                if self._index is not None:
+                    self._add_to_index(params_key, key, embedding)
+
+    @staticmethod
+    def _params_key(payload):
+        params = {k: v for k, v in payload.items() if k != "prompt"}
+        return LLMCache.make_key(params)
+
+    @staticmethod
+    def _expired(entry):
+        expires_at = entry.get("expires_at")
+        return expires_at is not None and expires_at < time.time()
+
+    def _embed(self, text):
+        """Return an L2-normalized embedding, or None if the semantic tier is unavailable."""
+        if self._embedder is None:
+            self._embedder = _load_embedder(self.embedding_model)
+            if self._embedder is None:
+                self.semantic = False
+                return None
+        if self._last_embedding[0] == text:
+            return self._last_embedding[1]
+        import numpy as np
+        vector = self._embedder.encode([text], normalize_embeddings=True)[0]
+        embedding = np.asarray(vector, dtype=np.float32)
+        self._last_embedding = (text, embedding)
+        return embedding
+
+    def _load_index(self):
+        """
+        Build the in-memory similarity index from the live backend entries.
+
+        Reuses the index another LLMCache already built for the same store; called with
+        _INDEX_LOCK held.
+        """
+        if self._store_id is not None and self._store_id in _INDEXES:
+            self._index = _INDEXES[self._store_id]
+            return
+        import numpy as np
+        self._index = {}
+        for key, entry in self.backend.items():
+            if self._expired(entry):
+                self.backend.delete(key)
+                continue
+            if entry.get("embedding") is not None:
+                self._add_to_index(entry["params"], key, np.asarray(entry["embedding"], dtype=np.float32))
+        if self._store_id is not None:
+            _INDEXES[self._store_id] = self._index
+
+    def _add_to_index(self, params_key, key, embedding):
+        import numpy as np
+        keys, index = self._index.get(params_key, ([], None))
+        row = embedding.reshape(1, -1)
+        faiss = _import_faiss()
+        if faiss is not None:
+            # Inner product on normalized vectors is cosine similarity
+            if index is None:
+                index = faiss.IndexFlatIP(row.shape[1])
+            index.add(row)
+        else:
+            index = row if index is None else np.vstack([index, row])
+        keys.append(key)
+        self._index[params_key] = (keys, index)
+
+    def _nearest(self, params_key, embedding):
+        # The lock keeps the key list and the index rows in step while another thread adds to them
+        with _INDEX_LOCK:
+            if self._index is None:
+                self._load_index()
+            keys, index = self._index.get(params_key, ([], None))
+            if not keys:
+                return None
+
+            if _import_faiss() is not None:
+                sims, ids = index.search(embedding.reshape(1, -1), 1)
+                best_sim, best_idx = float(sims[0][0]), int(ids[0][0])
+            else:
+                sims = index @ embedding
+                best_idx = int(sims.argmax())
+                best_sim = float(sims[best_idx])
+            best_key = keys[best_idx]
+
+        if best_sim < self.similarity_threshold:
+            return None
+        entry = self.backend.get(best_key)
+        if entry is None or self._expired(entry):
+            return None
+        print(f"Semantic LLM cache hit (similarity={best_sim:.3f})")
+        return entry["report"]
+
+
+def _import_faiss():
+    """Return the faiss module if installed; the numpy dot-product search is used otherwise."""
+    try:
+        import faiss
+    except Exception:
+        return None
+    return faiss
@@ -1,5 +1,10 @@
+import asyncio
+import hashlib
 import os
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
 
@@ -12,31 +17,121 @@ from dotenv import load_dotenv
 load_dotenv(project_root / ".env")
 
 from src.ai_summary import AiSummary
-from src.data_ingestion import DataIngestion
-import json
+from src.data_ingestion import DataIngestion, FrameContext
+from src.llm_cache import LLMCache
+from src.stats_format import dumps_stats, render_stats_markdown
+
+
+# The plotting and PDF stacks (matplotlib, seaborn, reportlab) are only imported once a report
+# is actually rendered, so importing this module for the stats step stays cheap.
+@lru_cache(maxsize=None)
+def _load_generate_visualizations():
+    from src.eda_visualization import generate_visualizations
+    return generate_visualizations
+
+
+@lru_cache(maxsize=None)
+def _load_generate_pdf_report():
+    from src.pdf_report import generate_pdf_report
+    return generate_pdf_report
+
+
+def _frame_fingerprint(df: pd.DataFrame, model_name: str, image_format: str = "png"):
+    """
+    Content hash identifying a report: the data (values and index), schema, model and chart format.
+
+    :param df: input DataFrame
+    :param model_name: LLM used for the summary, since it changes the report
+    :param image_format: chart format embedded in the PDF
+    :return: hex SHA-256 digest, or None when the frame holds unhashable values (e.g. lists)
+    """
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    except TypeError:
+        return None
+    digest = hashlib.sha256(row_hashes.tobytes())
+    schema = [model_name, image_format] + [f"{col}:{dtype}" for col, dtype in df.dtypes.items()]
+    digest.update("\x1f".join(map(str, schema)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink dtypes before analysis so every later full-frame scan moves fewer bytes.
+
+    Integers are downcast to the smallest integer type; floats are downcast only when the
+    values survive the round-trip exactly, so the statistics don't change; text columns
+    with mostly repeated values (unique ratio < 0.5) become `category`. The copy is internal:
+    reported dtypes and memory usage come from the original (`FrameContext.from_frame(source=...)`).
+
+    :param df: input DataFrame (not modified)
+    :return: a shallow copy with optimized column dtypes
+    """
+    df = df.copy(deep=False)
+    n_rows = len(df)
+    for col in df.columns:
+        series = df[col]
+        kind = series.dtype.kind
+        if kind in 'iu':
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif kind == 'f':
+            downcast = pd.to_numeric(series, downcast='float')
+            if downcast.dtype != series.dtype and (
+                (downcast.to_numpy(dtype='float64') == series.to_numpy())
+                | series.isna().to_numpy()
+            ).all():
+                df[col] = downcast
+        elif n_rows and (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            if series.nunique() / n_rows < 0.5:
+                df[col] = series.astype('category')
+    return df
+
         
-def generate_report(df_oai: pd.DataFrame = None):
+def generate_report(df_oai: pd.DataFrame = None, batch: bool = False, stream: bool = False):
     """
     Generate a report from a pandas DataFrame or (if df_oai is None) from the default WHR_2015.csv file.
 
     This function is callable from other modules (for example, `app.py` can pass the
     uploaded DataFrame as `df_oai`). When called as a script, it will read the built-in
-    `data/WHR_2015.csv` file.
+    `data/WHR_2015.csv` file. It is a blocking wrapper around `agenerate_report`.
+
+    With `batch=True` the AI summary goes through the OpenAI Batch API: half the price,
+    but results can take up to 24h, so only use it for non-interactive runs (CLI, backfills).
+    With `stream=True` a single summary prompt is streamed and written to the text report
+    as tokens arrive.
+
+    Reports are cached under `reports/.report_cache/` by a fingerprint of the data, schema
+    and model, so re-submitting the same DataFrame returns the stored PDF immediately.
+    Empty frames, and frames with fewer than `REPORT_MIN_ROWS` (default 2) rows, get a
+    short canned summary without calling the LLM.
+
+    Async callers (and environments with a running event loop, such as Jupyter) should
+    `await agenerate_report(...)` instead; called from inside a running loop, this wrapper
+    runs the report on a separate thread with its own loop and blocks until it finishes.
 
     Returns a tuple: (report_text: str, output_file: Path)
     """
-    project_root = Path(__file__).resolve().parents[1]
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(agenerate_report(df_oai, batch=batch, stream=stream))
+    # asyncio.run() refuses to nest inside a running loop
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, agenerate_report(df_oai, batch=batch, stream=stream)).result()
 
 
-    # Get API key from environment
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError(
-            "OPENAI_API_KEY not found. Please set it in your environment or create a .env file"
-        )
+async def agenerate_report(df_oai: pd.DataFrame = None, batch: bool = False, stream: bool = False):
+    """
+    Async implementation of `generate_report`.
+
+    The LLM call and the (CPU-bound, thread-offloaded) visualization step run concurrently.
+    """
+    project_root = Path(__file__).resolve().parents[1]
 
     # Get model name from environment or use default
     model_name = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    # 'svg' keeps the charts as vector drawings in the PDF (needs svglib)
+    image_format = os.getenv("REPORT_IMAGE_FORMAT", "png")
 
     try:
         # Require a DataFrame from callers (don't read default CSV automatically)
@@ -44,69 +139,125 @@ def generate_report(df_oai: pd.DataFrame = None):
             raise ValueError(
                 "df_oai was not provided. When calling generate_report programmatically, pass a pandas DataFrame."
             )
-        df = df_oai
+
+        # Identical data and model -> identical report; serve it without recomputing anything
+        report_path = project_root / "reports"
+        report_cache_dir = report_path / ".report_cache"
+        fingerprint = _frame_fingerprint(df_oai, model_name, image_format)
+        if fingerprint is not None:
+            cached_pdf = report_cache_dir / f"{fingerprint}.pdf"
+            cached_txt = report_cache_dir / f"{fingerprint}.txt"
+            if cached_pdf.exists() and cached_txt.exists():
+                print(f"\n♻️ Report cache hit, reusing {cached_pdf}")
+                return str(cached_pdf), cached_txt.read_text(encoding="utf-8")
+
+        df = _optimize_dtypes(df_oai)
 
         print("\n🤖 Generating comprehensive report...")
         # get basic summary
-        basic_stats, numeric_stats, categorical_stats, datetime_stats = DataIngestion.generate_basic_stats(df)
-        basic_summary = {
-            "basic_stats": basic_stats,
-            "numeric_stats": numeric_stats,
-            "categorical_stats": categorical_stats,
-            "datetime_stats": datetime_stats,
-        }
-        # Build a combined report text: pretty-print basic summary then AI interpretation
-        try:
-            basic_text = json.dumps(basic_summary, indent=2, default=str)
-        except Exception:
-            basic_text = str(basic_summary)
-
-        # Initialize the AI Summary generator
-        summary_generator = AiSummary.get_ai_model(
-            api_key=api_key,
-            model_name=model_name,
-        )
+        # Scan dtypes, nulls and the numeric block once for both stats and visualizations
+        ctx = FrameContext.from_frame(df, source=df_oai)
+        stats = DataIngestion.generate_basic_stats(df, ctx=ctx)
+        basic_summary = vars(stats)
+        # Build a combined report text: pretty-print basic summary then AI interpretation.
+        # The JSON goes to the text/PDF reports; prompts use the compact Markdown rendering.
+        basic_text = dumps_stats(basic_summary)
+
+        # Text version of the report (for reference); header first so streamed output can follow it
+        from datetime import datetime
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_path.mkdir(exist_ok=True)
+        output_file = report_path / f"whr_2015_analysis_{timestamp}.txt"
+        report_header = "".join([
+            "=== BASIC STATISTICS ===\n",
+            basic_text,
+            "\n\n=== AI-INTERPRETATION ===\n",
+        ])
 
-        ai_summary = summary_generator.generate_ai_summary(basic_text)
+        generate_visualizations = _load_generate_visualizations()
+        min_rows = int(os.getenv("REPORT_MIN_ROWS", "2"))
+        if len(df) < min_rows or len(df.columns) == 0:
+            # Nothing for the model to interpret; skip the LLM call (and the figures, if empty)
+            if len(df) == 0 or len(df.columns) == 0:
+                ai_summary = "No data to analyze: the dataset is empty."
+                visualization_paths = []
+            else:
+                ai_summary = (f"The dataset has only {len(df)} row(s), too few for a meaningful "
+                              "analysis; see the basic statistics above.")
+                visualization_paths = await asyncio.to_thread(generate_visualizations, df, ctx=ctx,
+                                                              image_format=image_format)
+            report_text = report_header + ai_summary
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(report_text)
+            report_complete = True
+        else:
+            # Get API key from environment
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise RuntimeError(
+                    "OPENAI_API_KEY not found. Please set it in your environment or create a .env file"
+                )
+
+            # Cache deterministic LLM responses so re-runs on the same/similar data skip the call
+            llm_cache = LLMCache(
+                backend=os.getenv("LLM_CACHE_BACKEND", "disk"),
+                cache_dir=project_root / "reports" / ".llm_cache",
+                similarity_threshold=float(os.getenv("LLM_CACHE_SIMILARITY", "0.92")),
+                semantic=os.getenv("LLM_CACHE_SEMANTIC", "false").lower() in ("1", "true", "yes"),
+                redis_url=os.getenv("LLM_CACHE_REDIS_URL"),
+            )
+
+            # Initialize the AI Summary generator
+            summary_generator = AiSummary.get_ai_model(
+                api_key=api_key,
+                model_name=model_name,
+                cache=llm_cache,
+            )
+
+            # Generate the AI summary and EDA visualizations concurrently
+            visualization_task = asyncio.to_thread(generate_visualizations, df, ctx=ctx,
+                                                   image_format=image_format)
+            try:
+                if stream:
+                    # Write tokens to the text report as they arrive instead of after the full response
+                    with open(output_file, "w", encoding="utf-8") as sink:
+                        sink.write(report_header)
+                        sink.flush()
+                        ai_summary, visualization_paths = await asyncio.gather(
+                            asyncio.to_thread(summary_generator.stream_ai_summary,
+                                              render_stats_markdown(**basic_summary), None, sink),
+                            visualization_task,
+                        )
+                    report_text = output_file.read_text(encoding="utf-8")
+                else:
+                    if batch:
+                        summary_task = asyncio.to_thread(summary_generator.generate_batch_summaries, basic_summary)
+                    else:
+                        summary_task = summary_generator.agenerate_section_summaries(
+                            basic_summary,
+                            max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "4")),
+                        )
+                    ai_summary, visualization_paths = await asyncio.gather(summary_task, visualization_task)
+                    ai_text = ai_summary if isinstance(ai_summary, str) else str(ai_summary)
+                    report_text = report_header + ai_text
+                    with open(output_file, "w", encoding="utf-8") as f:
+                        f.write(report_text)
+            finally:
+                await summary_generator.aclose()
+            report_complete = ai_summary is not None and summary_generator.last_report_complete
         print('-----------------------ai_summary--------------------')
         print(ai_summary)
         print('-----------------------------------------------------')
 
-        
-        # Generate EDA visualizations
-        from src.eda_visualization import generate_visualizations
-        visualization_paths = generate_visualizations(df)
-
         # Generate PDF report with visualizations
-        from src.pdf_report import generate_pdf_report
-        report_path = project_root / "reports"
-        
+        generate_pdf_report = _load_generate_pdf_report()
         pdf_file = generate_pdf_report(
             report_path=report_path,
-            basic_stats=basic_summary,
+            basic_stats=basic_text,
             ai_summary=ai_summary,
             visualization_paths=visualization_paths
         )
 
-        # Save the report with timestamp (text version for reference)
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path.mkdir(exist_ok=True)
-        output_file = report_path / f"whr_2015_analysis_{timestamp}.txt"
-
-
-        ai_text = ai_summary if isinstance(ai_summary, str) else str(ai_summary)
-
-        report_text = "".join([
-            "=== BASIC STATISTICS ===\n",
-            basic_text,
-            "\n\n=== AI-INTERPRETATION ===\n",
-            ai_text,
-        ])
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(report_text)
-
         # Print the report to console as well
         print("\n📝 Report Contents:")
         print("=" * 80)
@@ -115,6 +266,13 @@ def generate_report(df_oai: pd.DataFrame = None):
 
         print(f"\n Text report saved to: {output_file}")
         print(f" PDF report generated: {pdf_file}")
+
+        # Only complete reports are cached; a failed or partial AI summary (a dropped section,
+        # a stream cut off midway) shouldn't be replayed
+        if fingerprint is not None and report_complete:
+            report_cache_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(pdf_file, report_cache_dir / f"{fingerprint}.pdf")
+            (report_cache_dir / f"{fingerprint}.txt").write_text(report_text, encoding="utf-8")
         return str(pdf_file), report_text
 
     except Exception as e:
@@ -123,4 +281,14 @@ def generate_report(df_oai: pd.DataFrame = None):
 
 if __name__ == "__main__":
     # Keep CLI behavior: when run as a script, generate report from default CSV
-    generate_report()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate an AutoReport PDF from a CSV file.")
+    parser.add_argument("csv", nargs="?", default=str(project_root / "data" / "WHR_2015.csv"),
+                        help="CSV file to analyze (default: data/WHR_2015.csv)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Use the OpenAI Batch API (~50%% cheaper, may take up to 24h)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream a single AI summary into the text report as it is generated")
+    args = parser.parse_args()
+    generate_report(pd.read_csv(args.csv), batch=args.batch, stream=args.stream)
@@ -3,13 +3,186 @@ Module to generate comprehensive PDF reports with visualizations.
 """
 from pathlib import Path
 from datetime import datetime
+from functools import cached_property, lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import hashlib
+import io
 import json
+import numbers
+import os
+import threading
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle, KeepTogether, Frame
+from reportlab.platypus.doctemplate import LayoutError
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from reportlab.pdfbase import pdfmetrics
+
+from src.stats_format import dumps_stats, loads_stats
+
+
+# Escapes the characters Paragraph's markup parser treats specially and keeps line breaks
+_XML_ESCAPE_TABLE = str.maketrans({'\n': '<br/>', '<': '&lt;', '>': '&gt;', '&': '&amp;'})
+
+
+def _xml_escape(text):
+    """Escape plain text for a Paragraph in a single pass, turning newlines into <br/>."""
+    return text.translate(_XML_ESCAPE_TABLE)
+
+
+# Page margins of the report, and reportlab's default padding on each side of a Frame
+_MARGIN = 0.75*inch
+_FRAME_PADDING = 6
+
+# Embedded chart size and vertical spacer heights, shared by the story and the page-fit check
+_IMG_W = 6*inch
+_IMG_H = 4*inch
+_SP_SMALL = 0.1*inch
+_SP_MED = 0.2*inch
+_SP_LARGE = 0.3*inch
+
+
+# Chart file types the visualization section can embed
+_VIZ_SUFFIXES = frozenset({'.png', '.jpg', '.jpeg', '.svg'})
+
+
+def _frame_size():
+    """(width, height) available to flowables inside the page frame."""
+    return (letter[0] - 2*_MARGIN - 2*_FRAME_PADDING,
+            letter[1] - 2*_MARGIN - 2*_FRAME_PADDING)
+
+
+# Output directories already created by this process, so repeat reports skip the mkdir call
+_ENSURED_DIRS = set()
+
+
+def _ensure_dir(path):
+    """Create `path` (and parents) unless this process already has."""
+    key = str(path)
+    if key not in _ENSURED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(key)
+
+
+_STYLES = None
+_STYLES_LOCK = threading.Lock()
+
+
+def _get_styles():
+    """
+    The report's style sheet (sample styles plus the custom ones), built once per process.
+
+    Every generator shares it, so treat it as read-only. The font metrics of the standard
+    fonts used by the custom styles are loaded at the same time rather than during the
+    first build.
+    """
+    global _STYLES
+    if _STYLES is None:
+        with _STYLES_LOCK:
+            if _STYLES is None:
+                styles = getSampleStyleSheet()
+                PDFReportGenerator._setup_custom_styles(styles)
+                for name in ('CustomTitle', 'CustomHeading', 'CustomBody'):
+                    pdfmetrics.getFont(styles[name].fontName)
+                _STYLES = styles
+    return _STYLES
+
+
+@lru_cache(maxsize=64)
+def _read_image_bytes(path_str, mtime_ns, size):
+    """
+    A file's bytes, read in one call and cached on (path, mtime_ns, size).
+
+    The same bytes object feeds both the content digest and the Image flowable, so each
+    chart file is read once however many times it is hashed or embedded.
+    """
+    return Path(path_str).read_bytes()
+
+
+@lru_cache(maxsize=64)
+def _load_image(path_str, mtime_ns, size, width, height):
+    """
+    Image flowable for a file, cached across reports.
+
+    The (mtime_ns, size) pair is part of the key so a regenerated chart is picked up. The
+    pixels are decoded here with Pillow, once, into the ImageReader that every story copy of
+    a `PDFReportGenerator._load_flowable` result draws from. matplotlib writes RGBA PNGs
+    with a fully opaque alpha channel; those are converted to RGB so reportlab doesn't embed
+    (and compress) a redundant soft mask. JPEGs keep their raw bytes, which reportlab embeds
+    without decoding.
+    """
+    from PIL import Image as PILImage
+
+    data = _read_image_bytes(path_str, mtime_ns, size)
+    img = Image(io.BytesIO(data), width=width, height=height)
+    im = PILImage.open(io.BytesIO(data))
+    if im.format != 'JPEG':
+        im.load()
+        if im.mode in ('RGBA', 'LA') and im.getchannel('A').getextrema() == (255, 255):
+            im = im.convert(im.mode[:-1])
+        # Swap in a reader over the already decoded pixels (the size read from the file stays valid)
+        img._img = ImageReader(im)
+    return img
+
+
+@lru_cache(maxsize=64)
+def _file_digest(path_str, mtime_ns, size):
+    """Short SHA-256 of a file's (cached) bytes."""
+    return hashlib.sha256(_read_image_bytes(path_str, mtime_ns, size)).hexdigest()[:16]
+
+
+@lru_cache(maxsize=64)
+def _optimize_for_embed(path_str, mtime_ns, size, target_px=(900, 600)):
+    """
+    Downscale an image larger than `target_px` for embedding, keeping its aspect ratio.
+
+    Charts are drawn at 6 x 4 inches, so 900 x 600 px is 150 DPI; embedding more pixels only
+    inflates the PDF and the memory needed to build it. The resized copy is written next to
+    the original as `<name>.opt.png` and reused while it is newer than the source.
+
+    :return: Path of the image to embed (the original if it is already small enough)
+    """
+    from PIL import Image as PILImage
+
+    path = Path(path_str)
+    out = path.with_suffix('.opt.png')
+    try:
+        if out.stat().st_mtime_ns >= mtime_ns:
+            return out
+    except FileNotFoundError:
+        pass
+    with PILImage.open(io.BytesIO(_read_image_bytes(path_str, mtime_ns, size))) as im:
+        if im.size[0] <= target_px[0] and im.size[1] <= target_px[1]:
+            return path
+        im.thumbnail(target_px, PILImage.LANCZOS)
+        im.save(out, format='PNG', optimize=True)
+    return out
+
+
+@lru_cache(maxsize=64)
+def _load_drawing(path_str, mtime_ns, size, width, height):
+    """
+    Vector Drawing flowable for an SVG chart, scaled to `width` x `height` and cached across reports.
+
+    The drawing is embedded as PDF path operators, so there are no pixels to decode or
+    resample and scaling is a single transform matrix. Needs `svglib`.
+    """
+    try:
+        from svglib.svglib import svg2rlg
+    except ImportError as e:
+        raise ImportError("svglib not installed. Install with `pip install svglib` or use PNG charts.") from e
+
+    drawing = svg2rlg(io.BytesIO(_read_image_bytes(path_str, mtime_ns, size)))
+    if drawing is None:
+        raise ValueError(f"Could not parse SVG chart: {path_str}")
+    drawing.scale(width / drawing.width, height / drawing.height)
+    drawing.width, drawing.height = width, height
+    return drawing
 
 
 class PDFReportGenerator:
@@ -24,15 +197,21 @@ class PDFReportGenerator:
         """
         self.title = title
         self.author = author
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        # content digest -> Image flowable, so identical charts are loaded and embedded once
+        self._img_cache = {}
     
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles for the report."""
+    @cached_property
+    def styles(self):
+        """Style sheet for the report, looked up on first use (shared process-wide, see `_get_styles`)."""
+        return _get_styles()
+
+    @staticmethod
+    def _setup_custom_styles(styles):
+        """Setup custom paragraph styles for the report on a sample style sheet."""
         # Title style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=24,
             textColor=colors.HexColor('#1f4788'),
             spaceAfter=30,
@@ -41,9 +220,9 @@ class PDFReportGenerator:
         ))
         
         # Section heading style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomHeading',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=14,
             textColor=colors.HexColor('#2e5c8a'),
             spaceAfter=12,
@@ -52,9 +231,9 @@ class PDFReportGenerator:
         ))
         
         # Body text style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomBody',
-            parent=self.styles['BodyText'],
+            parent=styles['BodyText'],
             fontSize=11,
             alignment=TA_JUSTIFY,
             spaceAfter=10,
@@ -71,93 +250,199 @@ class PDFReportGenerator:
         :param visualization_paths: List of paths to visualization images (PNG/JPG)
         :return: Path to the generated PDF file
         """
-        report_path.mkdir(exist_ok=True)
+        _ensure_dir(report_path)
         
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pdf_filename = f"report_{timestamp}.pdf"
+        # Generate filename with timestamp; one clock read serves the filename and the cover
+        now = datetime.now()
+        pdf_filename = f"report_{now:%Y%m%d_%H%M%S}.pdf"
         pdf_file = report_path / pdf_filename
         
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            str(pdf_file),
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=0.75*inch,
-            bottomMargin=0.75*inch,
-            author=self.author,
-            title=self.title
-        )
-        
         # Build story (content)
         story = []
         
         # Add title
         story.append(Paragraph(self.title, self.styles['CustomTitle']))
-        story.append(Spacer(1, 0.3*inch))
+        story.append(Spacer(1, _SP_LARGE))
         
         # Add generation timestamp
-        timestamp_text = f"Generated on: {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}"
+        timestamp_text = f"Generated on: {now:%B %d, %Y at %H:%M:%S}"
         story.append(Paragraph(timestamp_text, self.styles['Normal']))
-        story.append(Spacer(1, 0.2*inch))
+        story.append(Spacer(1, _SP_MED))
         
         # Add Basic Statistics section
         story.append(Paragraph("📊 Basic Statistics", self.styles['CustomHeading']))
-        story.append(Spacer(1, 0.1*inch))
+        story.append(Spacer(1, _SP_SMALL))
         
         # Parse and format basic statistics
         try:
             if isinstance(basic_text, str):
                 # Try to parse as JSON for better formatting
                 try:
-                    stats_dict = json.loads(basic_text)
+                    stats_dict = loads_stats(basic_text)
                     stats_text = self._format_statistics_for_pdf(stats_dict)
                     story.append(Paragraph(stats_text, self.styles['CustomBody']))
                 except json.JSONDecodeError:
                     # If not JSON, just add the text
-                    story.append(Paragraph(basic_text.replace('\n', '<br/>'), self.styles['CustomBody']))
+                    story.append(Paragraph(_xml_escape(basic_text), self.styles['CustomBody']))
         except Exception as e:
             story.append(Paragraph(f"Error processing statistics: {str(e)}", self.styles['Normal']))
         
-        story.append(Spacer(1, 0.3*inch))
+        story.append(Spacer(1, _SP_LARGE))
         
         # Add AI Summary section
         story.append(Paragraph("🤖 AI-Generated Insights", self.styles['CustomHeading']))
-        story.append(Spacer(1, 0.1*inch))
+        story.append(Spacer(1, _SP_SMALL))
         
-        ai_text = ai_summary if isinstance(ai_summary, str) else str(ai_summary)
-        # Handle AI summary that might be a response object
-        if hasattr(ai_summary, 'choices'):
-            ai_text = ai_summary.choices[0].message.content if hasattr(ai_summary.choices[0].message, 'content') else str(ai_summary)
+        if isinstance(ai_summary, str):
+            ai_text = ai_summary
+        elif hasattr(ai_summary, 'choices'):
+            # Handle AI summary that might be a response object
+            message = ai_summary.choices[0].message
+            ai_text = getattr(message, 'content', None) or str(message)
+        else:
+            ai_text = str(ai_summary)
         
-        story.append(Paragraph(ai_text.replace('\n', '<br/>'), self.styles['CustomBody']))
-        story.append(Spacer(1, 0.3*inch))
+        # One Paragraph per blank-line separated block, so each is wrapped independently
+        for block in ai_text.split('\n\n'):
+            if block.strip():
+                story.append(Paragraph(_xml_escape(block), self.styles['CustomBody']))
+        story.append(Spacer(1, _SP_LARGE))
         
         # Add visualizations if provided
         if visualization_paths:
             story.append(PageBreak())
-            story.append(Paragraph("📈 Data Visualizations", self.styles['CustomHeading']))
-            story.append(Spacer(1, 0.2*inch))
-            
-            for viz_path in visualization_paths:
-                if isinstance(viz_path, str):
-                    viz_path = Path(viz_path)
-                
-                if viz_path.exists() and viz_path.suffix.lower() in ['.png', '.jpg', '.jpeg']:
-                    try:
-                        # Add image with appropriate sizing
-                        img = Image(str(viz_path), width=6*inch, height=4*inch)
-                        story.append(img)
-                        story.append(Spacer(1, 0.2*inch))
-                    except Exception as e:
-                        story.append(Paragraph(f"Error loading visualization: {viz_path}", self.styles['Normal']))
-        
-        # Build PDF
-        doc.build(story)
+            heading = Paragraph("📈 Data Visualizations", self.styles['CustomHeading'])
+            story.append(heading)
+            story.append(Spacer(1, _SP_MED))
+
+            # Track the used height of the current page and break explicitly before an image
+            # that won't fit, so Platypus lays the images out in one forward pass
+            frame_width, usable_height = _frame_size()
+            cursor = heading.wrap(frame_width, usable_height)[1] + heading.style.spaceAfter + _SP_MED
+            needed = _IMG_H + _SP_MED
+
+            # One stat() per chart: it both checks existence and keys the image caches
+            viz_entries = []
+            for viz_path in map(Path, visualization_paths):
+                if viz_path.suffix.lower() not in _VIZ_SUFFIXES:
+                    continue
+                try:
+                    viz_entries.append((viz_path, viz_path.stat()))
+                except FileNotFoundError:
+                    continue
+
+            # Read, downscale and decode the charts concurrently (Pillow and zlib release
+            # the GIL), one task per distinct file; the story is still appended in order
+            futures = {}
+            if viz_entries:
+                with ThreadPoolExecutor(max_workers=min(len(viz_entries), os.cpu_count() or 1)) as pool:
+                    for viz_path, stat in viz_entries:
+                        if viz_path not in futures:
+                            futures[viz_path] = pool.submit(self._load_flowable, viz_path, stat)
+
+            for viz_path, _ in viz_entries:
+                try:
+                    # Add image with appropriate sizing
+                    img = copy.copy(futures[viz_path].result())
+                    if cursor + needed > usable_height:
+                        story.append(PageBreak())
+                        cursor = 0
+                    story.append(KeepTogether([img, Spacer(1, _SP_MED)]))
+                    cursor += needed
+                except Exception as e:
+                    story.append(Paragraph(f"Error loading visualization: {viz_path}", self.styles['Normal']))
+
+        # Create the PDF document once the story is ready, written through one large buffered file handle
+        try:
+            pdf_handle = open(pdf_file, 'wb', buffering=1 << 20)
+        except FileNotFoundError:
+            # The directory was removed since it was first ensured; create it again
+            _ENSURED_DIRS.discard(str(report_path))
+            _ensure_dir(report_path)
+            pdf_handle = open(pdf_file, 'wb', buffering=1 << 20)
+        try:
+            # Every page break is explicit, so a report whose pages each fit their frame can be
+            # drawn straight onto a Canvas; anything that needs splitting goes through Platypus
+            if not self._draw_pages(pdf_handle, story):
+                doc = SimpleDocTemplate(
+                    pdf_handle,
+                    pagesize=letter,
+                    rightMargin=_MARGIN,
+                    leftMargin=_MARGIN,
+                    topMargin=_MARGIN,
+                    bottomMargin=_MARGIN,
+                    author=self.author,
+                    title=self.title
+                )
+                doc.build(story)
+        finally:
+            pdf_handle.close()
         
         return pdf_file
     
+    def _draw_pages(self, pdf_handle, story):
+        """
+        Fast path for `generate_pdf_report`: lay the story out on a bare Canvas, one Frame per page.
+
+        This skips the SimpleDocTemplate machinery (page templates, split handling, multi-pass
+        build) and draws the same frame geometry, so the output matches. It only applies when
+        the flowables between the story's PageBreaks fit on their page without splitting.
+
+        :param pdf_handle: binary file object the PDF is written to
+        :param story: flowables, with a PageBreak wherever a new page starts
+        :return: True if the PDF was written; False if a page overflows, in which case
+            nothing has been written and the story is still intact for SimpleDocTemplate
+        """
+        pages = [[]]
+        for flowable in story:
+            if isinstance(flowable, PageBreak):
+                pages.append([])
+            elif isinstance(flowable, KeepTogether):
+                # Each chart group already fits its page (see the cursor in generate_pdf_report)
+                pages[-1].extend(flowable._content)
+            else:
+                pages[-1].append(flowable)
+
+        canv = Canvas(pdf_handle, pagesize=letter)
+        canv.setAuthor(self.author)
+        canv.setTitle(self.title)
+        for page in pages:
+            frame = Frame(_MARGIN, _MARGIN, letter[0] - 2*_MARGIN, letter[1] - 2*_MARGIN)
+            try:
+                frame.addFromList(page, canv)
+            except LayoutError:
+                return False
+            if page:
+                return False
+            canv.showPage()
+        # The Canvas only writes to the file here, so an abandoned attempt leaves it empty
+        canv.save()
+        return True
+
+    def _load_flowable(self, viz_path, stat):
+        """
+        Return the shared flowable for a visualization file, backed by the image cache.
+
+        SVG files become vector Drawings; rasters are Images sharing one ImageReader, and
+        reportlab embeds identical image data as a single XObject per document. Platypus
+        keeps layout state on flowables, so add a `copy.copy` of it to the story, never
+        the shared object itself.
+
+        :param viz_path: Path of the chart file
+        :param stat: its `os.stat_result`, whose mtime and size key the caches
+        """
+        digest = _file_digest(str(viz_path), stat.st_mtime_ns, stat.st_size)
+        img = self._img_cache.get(digest)
+        if img is None and viz_path.suffix.lower() == '.svg':
+            img = _load_drawing(str(viz_path), stat.st_mtime_ns, stat.st_size, _IMG_W, _IMG_H)
+            self._img_cache[digest] = img
+        elif img is None:
+            embed_path = _optimize_for_embed(str(viz_path), stat.st_mtime_ns, stat.st_size)
+            embed_stat = embed_path.stat() if embed_path != viz_path else stat
+            img = _load_image(str(embed_path), embed_stat.st_mtime_ns, embed_stat.st_size, _IMG_W, _IMG_H)
+            self._img_cache[digest] = img
+        return img
+
     @staticmethod
     def _format_statistics_for_pdf(stats_dict):
         """
@@ -166,22 +451,29 @@ class PDFReportGenerator:
         :param stats_dict: Dictionary of statistics
         :return: Formatted string
         """
-        lines = []
-        
+        parts = []
+
         if 'basic_stats' in stats_dict:
             basic = stats_dict['basic_stats']
-            lines.append(f"<b>Dataset Overview:</b><br/>")
-            lines.append(f"Rows: {basic.get('rows', 'N/A')}<br/>")
-            lines.append(f"Columns: {basic.get('columns', 'N/A')}<br/>")
-            lines.append(f"Memory Usage: {basic.get('memory_usage', 'N/A'):.2f} MB<br/><br/>")
-        
+            # Missing or null (NaN serialized by orjson) memory usage has no float to format
+            memory_usage = basic.get('memory_usage')
+            if isinstance(memory_usage, numbers.Real) and not isinstance(memory_usage, bool):
+                memory_text = f"{memory_usage:.2f} MB"
+            else:
+                memory_text = "N/A"
+            parts.append(
+                "<b>Dataset Overview:</b><br/>"
+                f"Rows: {basic.get('rows', 'N/A')}<br/>"
+                f"Columns: {basic.get('columns', 'N/A')}<br/>"
+                f"Memory Usage: {memory_text}<br/><br/>"
+            )
+
         if 'numeric_stats' in stats_dict:
-            lines.append(f"<b>Numeric Columns Summary:</b><br/>")
-            numeric = stats_dict['numeric_stats']
-            if 'basic' in numeric:
-                lines.append(f"Descriptive statistics available for numeric columns<br/><br/>")
-        
-        return ''.join(lines)
+            parts.append("<b>Numeric Columns Summary:</b><br/>")
+            if 'basic' in stats_dict['numeric_stats']:
+                parts.append("Descriptive statistics available for numeric columns<br/><br/>")
+
+        return ''.join(parts)
 
 
 def generate_pdf_report(report_path, basic_stats, ai_summary, visualization_paths=None):
@@ -198,7 +490,7 @@ def generate_pdf_report(report_path, basic_stats, ai_summary, visualization_path
     
     # Convert basic_stats to string if it's a dict
     if isinstance(basic_stats, dict):
-        basic_text = json.dumps(basic_stats, indent=2, default=str)
+        basic_text = dumps_stats(basic_stats)
     else:
         basic_text = str(basic_stats)
     
@@ -0,0 +1,160 @@
+"""
+Serialization of the statistics produced by `DataIngestion.generate_basic_stats`.
+"""
+import json
+
+import numpy as np
+
+
+def _default(obj):
+    """Fallback for values neither encoder handles natively (dtypes, Timestamps, ...)."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+
+def dumps_stats(stats, indent=True):
+    """
+    Serialize a statistics dict to JSON text, encoding NumPy arrays and scalars directly.
+
+    Uses `orjson` (OPT_SERIALIZE_NUMPY) when installed; falls back to the stdlib encoder.
+    NaN values become `null` with orjson, as JSON has no NaN literal.
+
+    :param stats: dict of statistics, e.g. `vars(DatasetStats)`
+    :param indent: pretty-print with a 2-space indent
+    :return: str, JSON text
+    """
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(stats, option=option, default=_default).decode()
+    return json.dumps(stats, indent=2 if indent else None, default=_default)
+
+
+def loads_stats(text):
+    """
+    Parse JSON statistics text, using `orjson` when installed.
+
+    :param text: JSON text, e.g. from `dumps_stats`
+    :return: parsed object
+    :raises json.JSONDecodeError: if the text is not valid JSON (orjson's error subclasses it)
+    """
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(text)
+    return orjson.loads(text)
+
+
+def _fmt(value):
+    """Compact cell text: 3 significant digits for floats, integers and labels as-is."""
+    if value is None:
+        return "-"
+    if isinstance(value, (bool, np.bool_)):
+        return "yes" if value else "no"
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return format(float(value), '.3g')
+    return str(value).replace("|", "\\|")
+
+
+def _table(header, rows):
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    lines.extend("| " + " | ".join(_fmt(v) for v in row) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def _overview_markdown(basic_stats):
+    missing = basic_stats.get("missing_values", {})
+    parts = [
+        f"rows: {_fmt(basic_stats.get('rows'))}, columns: {_fmt(basic_stats.get('columns'))}, "
+        f"memory: {_fmt(basic_stats.get('memory_usage'))} MB",
+        _table(["column", "dtype", "missing"],
+               [(col, dtype, missing.get(col, 0)) for col, dtype in basic_stats.get("dtypes", {}).items()]),
+    ]
+    return "\n".join(parts)
+
+
+def _numeric_markdown(numeric_stats):
+    columns = numeric_stats.get("columns") or []
+    if not columns:
+        return ""
+    desc = numeric_stats["basic"]
+    stat_names = ["mean", "std", "min", "25%", "50%", "75%", "max"]
+    rows = []
+    for j, col in enumerate(columns):
+        rows.append([col, int(desc["count"][j])] + [desc[name][j] for name in stat_names]
+                    + [numeric_stats["skew"][j], numeric_stats["kurtosis"][j]])
+    return _table(["column", "count"] + stat_names + ["skew", "kurt"], rows)
+
+
+def _correlations_markdown(top_correlations):
+    return _table(["col1", "col2", "r"],
+                  [(c["col1"], c["col2"], c["correlation"]) for c in top_correlations or []])
+
+
+def _categorical_markdown(categorical_stats):
+    rows = []
+    for col, stats in categorical_stats.items():
+        top = ", ".join(f"{_fmt(label)} ({_fmt(count)})" for label, count in stats["top_5_values"].items())
+        rows.append((col, stats["unique_values"], stats["null_count"], stats["is_binary"],
+                     stats.get("entropy"), top))
+    return _table(["column", "unique", "nulls", "binary", "entropy", "top values (count)"], rows)
+
+
+def _datetime_markdown(datetime_stats):
+    return _table(["column", "min", "max", "range_days", "nulls"],
+                  [(col, s["min"], s["max"], s["range_days"], s["null_count"]) for col, s in datetime_stats.items()])
+
+
+def render_section_markdown(key, sub_key, section):
+    """
+    Render one statistics section as compact Markdown for an LLM prompt.
+
+    :param key: top-level stats key, e.g. 'numeric_stats'
+    :param sub_key: 'distributions' or 'top_correlations' for the numeric section, else None
+    :param section: the section's statistics
+    :return: str, Markdown text
+    """
+    if key == "basic_stats":
+        return _overview_markdown(section)
+    if key == "numeric_stats":
+        if sub_key == "top_correlations":
+            return _correlations_markdown(section)
+        return _numeric_markdown(section)
+    if key == "categorical_stats":
+        return _categorical_markdown(section)
+    if key == "datetime_stats":
+        return _datetime_markdown(section)
+    raise ValueError(f"Unknown statistics section: {key!r}")
+
+
+def render_stats_markdown(basic_stats, numeric_stats, categorical_stats, datetime_stats):
+    """
+    Render the statistics as Markdown tables, a fraction of the tokens of indented JSON.
+
+    Floats are cut to 3 significant digits. This is the LLM-facing form; the text and PDF
+    reports keep the full-precision JSON from `dumps_stats`.
+
+    :return: str, Markdown text with one `##` heading per non-empty section
+    """
+    sections = [
+        ("Overview", "basic_stats", None, basic_stats),
+        ("Numeric", "numeric_stats", "distributions", numeric_stats),
+        ("Correlations", "numeric_stats", "top_correlations", (numeric_stats or {}).get("top_correlations")),
+        ("Categorical", "categorical_stats", None, categorical_stats),
+        ("Datetime", "datetime_stats", None, datetime_stats),
+    ]
+    parts = []
+    for heading, key, sub_key, section in sections:
+        text = render_section_markdown(key, sub_key, section) if section else ""
+        if text:
+            parts.append(f"## {heading}\n{text}")
+    return "\n\n".join(parts)
@@ -1,10 +1,65 @@
 
+import importlib.util
+import io
 import streamlit as st
 import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
 from src.main import generate_report
 
+
+def _read_upload(file_bytes: bytes, name: str) -> pd.DataFrame:
+    """
+    Parse an uploaded CSV/XLSX file. Only called on a `_cached_generate_report` miss, so reruns
+    with the same upload never re-parse (or unpickle) the DataFrame.
+
+    CSVs are parsed with pandas' multithreaded pyarrow engine when pyarrow is installed; Excel
+    files use the calamine engine when `python-calamine` is installed.
+    """
+    if name.lower().endswith(".xlsx"):
+        try:
+            return pd.read_excel(io.BytesIO(file_bytes), engine="calamine")
+        except ImportError:
+            return pd.read_excel(io.BytesIO(file_bytes))
+    # pandas' pyarrow engine keeps pandas' NA rules (empty cells, "NA", ... become NaN in text
+    # columns too), so uploads get the same stats as the CLI's plain `pd.read_csv`
+    engine = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else None
+    return pd.read_csv(io.BytesIO(file_bytes), engine=engine)
+
+
+@st.cache_data(show_spinner="Generating report...", max_entries=8)
+def _cached_generate_report(file_bytes: bytes, name: str):
+    """Run `generate_report` once per distinct upload; widget-driven reruns reuse the result."""
+    return generate_report(_read_upload(file_bytes, name))
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _read_pdf(path_str: str, mtime_ns: int) -> bytes:
+    """
+    PDF bytes for the download button, re-read only when the file changes.
+
+    `cache_resource` hands every rerun the same bytes object, where `cache_data` would
+    unpickle a fresh copy of the whole PDF each time.
+    """
+    return Path(path_str).read_bytes()
+
+
+def _handle_upload(uploaded_file):
+    """
+    Parse the upload and generate (or reuse) its report.
+
+    :return: (output_path, report_text, pdf_bytes); pdf_bytes is None if the PDF is missing
+    """
+    file_bytes = uploaded_file.getvalue()
+    output_path, report_text = _cached_generate_report(file_bytes, uploaded_file.name)
+    pdf_path = Path(output_path)
+    try:
+        pdf_bytes = _read_pdf(str(pdf_path), pdf_path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        pdf_bytes = None
+    return output_path, report_text, pdf_bytes
+
+
 # ============ Header Logo =============
 # Load logo relative to this file so it works regardless of the current working directory
 logo_path = Path(__file__).resolve().parent / "unt-stacked-logo.png"
@@ -25,11 +80,10 @@ env_path = project_root / ".env"
 if env_path.exists():
     load_dotenv(env_path)
 
-if uploaded_file is not None:
-    df_oai = pd.read_csv(uploaded_file)
-    output_path, report_text = generate_report(df_oai)
+upload_result = _handle_upload(uploaded_file) if uploaded_file is not None else None
+if upload_result is not None:
+    output_path, report_text, pdf_bytes = upload_result
     st.success(f"Report saved to: {output_path}")
-    pdf_path = Path(output_path)
 
 #============pdf_report_download==============
 
@@ -46,23 +100,19 @@ st.title("📄 PDF report (Output)")
 #where we expect pdf file to appear
 #adjust to match whatever pdf_report.py uses
 
-if uploaded_file is not None:
-    if pdf_path.exists():
-        with pdf_path.open("rb") as f:
-            st.download_button(
-                label="Download PDF Report",
-                data=f,
-                file_name="AI_Data_Report.pdf",
-                mime="application/pdf",
-                key="download-pdf",
-            )
+if upload_result is not None:
+    if pdf_bytes is not None:
+        st.download_button(
+            label="Download PDF Report",
+            data=pdf_bytes,
+            file_name="AI_Data_Report.pdf",
+            mime="application/pdf",
+            key="download-pdf",
+        )
     else:
         st.info("PDF report not found. Once the backend creates a pdf you will see a download button here.")
 
-#display the report on UI
-
-
-if uploaded_file is not None:
+    #display the report on UI
     if report_text is not None:
         st.title("📝 Report Text Output")
-        st.text(report_text)
\ No newline at end of file
+        st.text(report_text)